@@ -32,11 +32,10 @@ class Auction(object):
 
             self.actor.refuse( "winner" )
             
-            dramatis.release( self.actor.name ).close()
+            dramatis.send_after( self._closing - time.time(),
+                                 self.actor.name, "close" )
 
         def close(self):
-            self.actor.actor_yield( self._closing - time.time() )
-
             if self._max_bid > self._min_bid:
                 dramatis.release( self._seller ).winner( self._max_bidder )
                 dramatis.release( self._max_bidder ).winner( self._seller )
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+# cf. http://gee.cs.oswego.edu/dl/papers/fj.pdf
+# conservative.py, with the sequential leaves run in shard processes
+
+import math
+import time
+import inspect
+import sys
+import os.path
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..', 'lib' ) ]
+
+from logging import warning
+
+import dramatis
+import dramatis.runtime
+
+THREAD_LEVELS = None
+SHARDS = None
+SEQUENTIALS = None
+
+class Sequential (object):
+
+    def fib(self,n):
+        if n <= 1:
+            return n
+        else:
+            return self.fib(n-1) + self.fib(n-2)
+
+class Fib (dramatis.Actor):
+    
+    @property
+    def value(self): return self._value
+
+    def __init__(self, n, level = None, leaf = 0 ):
+        if level  == None:
+            level = THREAD_LEVELS
+        self.actor.refuse("value")
+        dramatis.release( self.actor.name ).calc( n, level, leaf )
+
+    def calc(self, n, level, leaf ):
+        if level == 0:
+            self._value = SEQUENTIALS[ leaf % len(SEQUENTIALS) ].fib( n )
+        else:
+            left = Fib( n - 1, level - 1, 2 * leaf )
+            right = Fib( n - 2, level - 1, 2 * leaf + 1 )
+            self._value = left.value + right.value
+        self.actor.accept( "value" )
+
+n = None
+try:
+    n = int(sys.argv[1])
+except: pass
+if not ( n and n > 0):
+    n = 32
+
+processes = None
+try:
+    processes = int(sys.argv[2])
+except: pass
+if not (processes and processes > 1):
+    processes = 1
+
+THREAD_LEVELS = math.ceil( ( math.log(processes)/math.log(2) ) )
+SHARDS = dramatis.runtime.Shards( processes )
+
+# one sequential actor per shard, shared by the leaves placed there;
+# a leaf's call waits, like any rpc, without holding up other actors
+SEQUENTIALS = [ SHARDS.spawn( Sequential, shard = i )
+                for i in xrange( processes ) ]
+
+now = time.time()
+print "fib(%d) = %d" % ( n, Fib(n).value )
+print "%d processes" % processes, time.time() - now
+
+SHARDS.stop()
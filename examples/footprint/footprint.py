@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+# the memory an idle actor and a queued message take up:
+#
+#   footprint.py [actors [messages]]
+
+import gc
+import inspect
+import sys
+import os.path
+import resource
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..', 'lib' ) ]
+
+from logging import warning
+
+import dramatis
+
+class Sink ( dramatis.Actor ):
+
+    def __init__(self):
+        self._received = 0
+
+    @property
+    def received(self):
+        return self._received
+
+    def poke(self,n):
+        self._received += 1
+
+    def hold(self):
+        self.actor.refuse( "poke" )
+
+    def drain(self):
+        self.actor.accept( "poke" )
+
+def rss():
+    try:
+        pages = int( open( "/proc/self/statm" ).read().split()[1] )
+        return pages * resource.getpagesize()
+    except IOError:
+        return resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss * 1024
+
+def measure(count,function):
+    gc.collect()
+    objects, bytes = len( gc.get_objects() ), rss()
+    kept = function()
+    gc.collect()
+    objects, bytes = len( gc.get_objects() ) - objects, rss() - bytes
+    return kept, float(bytes) / count, float(objects) / count
+
+actors = len(sys.argv) > 1 and int(sys.argv[1]) or 20000
+messages = len(sys.argv) > 2 and int(sys.argv[2]) or 20000
+
+# warm up the runtime so that its own setup isn't counted
+sink = Sink()
+dramatis.release( sink ).poke( 0 )
+dramatis.Runtime.current.quiesce()
+
+names, bytes, objects = measure( actors,
+                                 lambda: [ Sink() for i in xrange(actors) ] )
+print "idle actor: %6.0f bytes %5.1f gc objects" % ( bytes, objects )
+
+sink = Sink()
+sink.hold()
+poke = dramatis.release( sink ).poke
+def send():
+    for i in xrange(messages):
+        poke( i )
+kept, bytes, objects = measure( messages, send )
+print "queued message: %6.0f bytes %5.1f gc objects" % ( bytes, objects )
+
+sink.drain()
+dramatis.Runtime.current.quiesce()
+assert sink.received == messages
@@ -16,6 +16,7 @@ Runtime = dramatis.runtime.Runtime
 
 import dramatis.actor
 Actor = dramatis.actor.Actor
+from dramatis.actor.name.name import derived as _derived
 
 import dramatis.deadlock
 Deadlock = dramatis.deadlock.Deadlock
@@ -49,18 +50,144 @@ def interface( object, *args, **kwds ):
 def release( name ):
     """Return an actor name with asynchronous semantics.
 
-    Takes an actor name and returns a new actor name which, when used
+    Takes an actor name and returns an actor name which, when used
     as the target of a method call, will pass a null continuation. As
     a result, the call will not block or otherwise wait for a
     result. The result of such a call is always nil."""
 
+    if type(name) is Actor.Name:
+        return _derived( name, "release", _release )
+    return _release( name )
+
+def _release( name ):
     return interface( name ).continuation( None )
 
 def future( name ):
     """Return an actor name with future semantics.
 
-    Takes an actor name and returns a new actor name which, when used
+    Takes an actor name and returns an actor name which, when used
     as the target of a method call, will pass a future
     continuation. It immediately returns a dramatis.Future object."""
 
+    if type(name) is Actor.Name:
+        return _derived( name, "future", _future )
+    return _future( name )
+
+def _future( name ):
     return interface( name ).future()
+
+def stream( name, window = 16 ):
+    """Return an actor name with streaming semantics.
+
+    Takes an actor name and returns an actor name which, when used
+    as the target of a method call, immediately returns an iterator
+    over the items of the iterable, e.g., a generator, that the method
+    returns. Items are handed over as the actor produces them, so the
+    caller can start on the first before the last exists, and the
+    actor runs at most window items ahead of the caller, so they
+    needn't all be held at once."""
+
+    return interface( name ).stream( window )
+
+def pipeline( future ):
+    """Return a proxy that pipelines calls through a future.
+
+    Takes a dramatis.Future that will hold an actor name and returns a
+    dramatis.future_value.Pipeline. Calling a method on it doesn't
+    block: the call goes to the actor name as soon as the actor
+    producing it returns it, and a dramatis.Future for the call's
+    value is returned immediately."""
+
+    return interface( future ).pipeline()
+
+def wait_all( futures ):
+    """Wait for the values of all of a list of futures.
+
+    The caller is suspended, with rpc gating semantics, until every
+    future has its value (or exception), but only once for the whole
+    list rather than once per future. The values can then be read
+    without blocking."""
+
+    dramatis.runtime.continuation.Group( futures ).take( len(futures) )
+
+def wait_any( futures ):
+    """Wait for the first of a list of futures to get its value.
+
+    Returns that future. The list must not be empty."""
+
+    if not futures:
+        raise dramatis.error.Error( "wait_any needs at least one future" )
+    return dramatis.runtime.continuation.Group( futures ).take( 1 )[0]
+
+def as_completed( futures ):
+    """Iterate over a list of futures in the order their values arrive.
+
+    Each step waits, like wait_any, for the next future to get its
+    value; futures that already have one are returned without
+    suspending the caller."""
+
+    group = dramatis.runtime.continuation.Group( futures )
+    while len(group):
+        yield group.take( 1 )[0]
+
+def send_after( seconds, name, method, *args ):
+    """Send a message to an actor after a delay.
+
+    Calls method, with args, on the actor name seconds from now, as
+    if through dramatis.release. Returns a timer whose cancel method
+    stops the message from being sent. Waiting timers take no threads
+    of their own."""
+
+    return dramatis.runtime.Scheduler.current.timers.after(
+        seconds,
+        dramatis.runtime.timers.Send( name, method, args ) )
+
+def send_interval( seconds, name, method, *args ):
+    """Send a message to an actor periodically.
+
+    Like send_after but sends the message every seconds seconds until
+    the timer returned is cancelled."""
+
+    return dramatis.runtime.Scheduler.current.timers.after(
+        seconds,
+        dramatis.runtime.timers.Send( name, method, args ),
+        seconds )
+
+def priority( name, priority ):
+    """Return an actor name that sends calls with a priority.
+
+    Takes an actor name and returns a new actor name whose calls are
+    run, under the dramatis.runtime.policy.Priority scheduling policy,
+    ahead of calls with lower priorities. The name keeps the
+    continuation semantics of the one passed, so, e.g.,
+    dramatis.release( dramatis.priority( name, 10 ) ) works."""
+
+    return interface( name ).priority( priority )
+
+def coroutine( method ):
+    """Mark an actor method, written as a generator, as a coroutine.
+
+    A coroutine method yields the futures it waits for, e.g.,
+
+      @dramatis.coroutine
+      def sum( self ):
+          a = yield dramatis.future( store ).get( 1 )
+          yield a + 1
+
+    Each yielded future is waited for without holding a thread; the
+    first value yielded that is not a future is the result of the
+    call. A generator returned by a method that isn't marked is an
+    ordinary return value."""
+
+    method.dramatis_coroutine = True
+    return method
+
+def deadline( name, seconds ):
+    """Return an actor name that sends calls with a deadline.
+
+    Takes an actor name and returns a new actor name whose calls must
+    run within the given number of seconds of being sent; the
+    dramatis.runtime.policy.EarliestDeadline scheduling policy runs
+    the call with the earliest deadline first."""
+
+    return interface( name ).deadline( seconds )
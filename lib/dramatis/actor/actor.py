@@ -8,6 +8,7 @@ import dramatis.runtime as runtime
 from dramatis.actor.interface import Interface as _Interface
 
 from dramatis.actor.behavior import Behavior as _Behavior
+from dramatis.actor.behavior import bind as _bind
 
 class Metaclass(type(_Behavior)):
     
@@ -48,18 +49,7 @@ class Metaclass(type(_Behavior)):
             interface = actor._interface
             name = actor.name
             behavior = cls.__new__( cls, *args, **kwds )
-            class actor_class ( behavior.__class__ ):
-                @property
-                def actor( cls ):
-                    """provide access to the interface object for this actor
-
-                    self.actor provides classes that have derived from
-                    dramatis.Actor access to a dramatis.Actor.Interface
-                    object by which they can access
-                    their actor name and other actor operations."""
-                    return interface
-            behavior.__class__ = actor_class
-            # warning( "! " + str( behavior.__class__ ) )
+            _bind( behavior, interface )
             actor.bind( behavior )
             actor._gate.refuse( "object" )
             actor.actor_send( ( "object_initialize", ) + args, { "continuation": "rpc" } )
@@ -11,19 +11,19 @@ from dramatis.actor.interface import Interface as _Interface
 class Metaclass(type):
     
     def __init__(cls,name,bases,dict):
-        super(Metaclass,cls).__init__(cls,name,bases, dict)
-        
-    def __call__( cls, *args, **kwds ):
-        # See also actor comments ...
-        interface = dramatis.Actor.Interface( None )
-        behavior = cls.__new__( cls, *args, **kwds )
-        class actor_class ( behavior.__class__ ):
-            @property
-            def actor( cls ):
-                return interface
-        behavior.__class__ = actor_class
-        behavior.__init__( *args, **kwds )
-        return behavior
+        super(Metaclass,cls).__init__(name,bases, dict)
+
+# the interface of behaviors not bound to an actor
+_unbound = _Interface( None )
+
+def bind( behavior, interface ):
+    """Makes interface the actor interface of behavior or, given None,
+    unbinds it. Only the instance changes; the class stays the same
+    for every behavior of a type."""
+    if interface is None:
+        behavior.__dict__.pop( "_dramatis_interface", None )
+    else:
+        behavior.__dict__["_dramatis_interface"] = interface
         
 class Behavior(object):
     """Class used as the base of actor behavior classes.
@@ -33,3 +33,13 @@ class Behavior(object):
     method hook or value-add operations."""
 
     __metaclass__ = Metaclass
+
+    @property
+    def actor( self ):
+        """provide access to the interface object for this actor
+
+        self.actor provides classes that have derived from
+        dramatis.Actor access to a dramatis.Actor.Interface
+        object by which they can access
+        their actor name and other actor operations."""
+        return self.__dict__.get( "_dramatis_interface", _unbound )
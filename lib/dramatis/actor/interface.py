@@ -1,7 +1,6 @@
 from __future__ import absolute_import
 from __future__ import with_statement
 
-import time
 from logging import warning
 
 import dramatis
@@ -35,6 +34,8 @@ class Interface(object):
 
     This object should only be accessed from the actor it represents."""
 
+    __slots__ = ( "_actor", )
+
     def __init__(self,actor):
         self._actor = actor
 
@@ -85,6 +86,75 @@ class Interface(object):
         an rpc on actor B which does an rpc on actor A), is allowed."""
         self._actor._set_call_threading_enabled(True)
 
+    def enable_caller_runs( self ):
+        """Lets blocking calls to this actor run on the caller's thread.
+
+        When another actor makes an rpc on this actor while it is idle
+        and its gate accepts the call, the method runs directly on the
+        calling actor's thread instead of being queued for a worker.
+        The actor still runs one task at a time and gating is
+        unchanged. Calls made from the main thread, futures, and
+        nonblocking calls are always queued."""
+        self._actor._set_caller_runs(True)
+
+    def set_throughput( self, quantum ):
+        """Sets the number of tasks this actor may run back to back.
+
+        When a task completes and the gate accepts another queued
+        task, the worker thread that ran the first task runs up to
+        quantum tasks from this actor's queue before yielding to other
+        actors. A quantum of None reverts to the runtime default,
+        dramatis.Runtime.current.throughput, which is 1 (each task is
+        scheduled separately)."""
+        self._actor.throughput = quantum
+
+    def set_priority( self, priority ):
+        """Sets the priority of tasks sent to this actor.
+
+        Only used by the dramatis.runtime.policy.Priority scheduling
+        policy, which runs tasks with higher priorities first. Calls
+        made through a name with a priority (see dramatis.priority)
+        use that instead. The default is 0."""
+        self._actor.priority = priority
+
+    def set_deadline( self, seconds ):
+        """Sets the deadline of tasks sent to this actor, in seconds
+        from when each is sent.
+
+        Only used by the dramatis.runtime.policy.EarliestDeadline
+        scheduling policy. Calls made through a name with a deadline
+        (see dramatis.deadline) use that instead. None, the default,
+        means no deadline."""
+        self._actor.deadline = seconds
+
+    @property
+    def cancelled( self ):
+        """Returns true if the caller has cancelled the call being run.
+
+        A call made through a future can be cancelled with
+        dramatis.Future.Interface.cancel. If it hasn't started, it is
+        simply never run; if it has, it runs on unless the method
+        checks this flag and gives up. Its result is dropped either
+        way."""
+        return self._actor.cancelled
+
+    def forward( self, name ):
+        """Returns a name for passing the call being run on to another
+        actor.
+
+        A method called on the name returned is sent to name's actor
+        with the continuation of the call this actor is running, so
+        that actor answers this actor's caller directly, e.g.,
+
+          def login( self, group, user, client ):
+              self.actor.forward( self._server ).login( group, user, client )
+
+        The call returns None at once and this actor carries on; what
+        the method returns is ignored. An exception it raises still
+        goes to the caller, unless the forwarded call has answered
+        first. Should be called at most once per call."""
+        return self._actor.forward( name )
+
     @property
     def name( self ):
         "Returns the actor name for the object."
@@ -96,20 +166,16 @@ class Interface(object):
         Currently, messages are handled FIFO so the yield will
         return when all the messages received up to the point of the
         yield are executed. This could be modified if non-FIFO queue
-        processing is added."""
+        processing is added.
 
-        class Sleeper ( dramatis.Actor ):
-            def nap(self, t):
-                time.sleep( t )
+        If t is given, the yield is sent to the actor t seconds from
+        now, by the runtime's timer service, so the actor keeps
+        running other tasks for at least that long."""
 
+        options = { "continuation": "rpc", "nonblocking": True }
         if t > 0:
-            sleeper = Sleeper()
-            ( dramatis.interface( sleeper ).
-              continuation( { "continuation": "rpc",
-                              "nonblocking": True } ) ).nap( t )
-
-        self._actor.actor_send( [ "actor_yield" ], { "continuation": "rpc",
-                                                     "nonblocking": True } )
+            options["delay"] = t
+        self._actor.actor_send( [ "actor_yield" ], options )
         return None
 
     def become(self, behavior):
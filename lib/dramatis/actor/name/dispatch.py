@@ -0,0 +1,69 @@
+from __future__ import absolute_import
+
+from logging import warning
+from traceback import print_stack
+
+from weakref import WeakKeyDictionary
+from weakref import ref
+
+def _func(): pass
+_func = type(_func)
+
+class _Class(object):
+    def _method(self): pass
+
+_instmeth = type( _Class._method )
+
+# anything else a name proxies as a function call: slot wrappers,
+# e.g., __str__, and attributes like __dict__
+_wrap_desc = type( object.__init__ )
+_getset_desc = type( type.__dict__["__name__"] )
+
+_functions = ( _func, _instmeth, _wrap_desc, _getset_desc )
+
+def classify( desc ):
+    """Returns how a name proxies an attribute whose descriptor is
+    desc: "property" or "function"."""
+    if type(desc) == property:
+        return "property"
+    elif type(desc) in _functions:
+        return "function"
+    print_stack()
+    warning(  "hell: type? " + str( type(desc) ) )
+    raise Exception( "hell: type? " + str( type(desc) ) )
+
+class Table(dict):
+    """The classifications of the attributes of a behavior class,
+    filled in as names look them up.
+
+    An attribute the class doesn't define (at this time) is assumed to
+    be a function. The table only holds a weak reference to the class,
+    the key it is kept under."""
+
+    def __init__( self, cls ):
+        self._class = ref( cls )
+
+    def __missing__( self, attr ):
+        kind = "function"
+        for out in self._class().__mro__:
+            desc = out.__dict__.get( attr )
+            if ( desc ):
+                kind = classify( desc )
+                break
+        self[attr] = kind
+        return kind
+
+_tables = WeakKeyDictionary()
+
+def table( cls ):
+    """Returns the dispatch table shared by behaviors of class cls."""
+    result = _tables.get( cls )
+    if result is None:
+        result = _tables[cls] = Table( cls )
+    return result
+
+def invalidate( cls ):
+    """Drops the dispatch table of cls, e.g., after attributes of cls
+    have been redefined; names of actors with behaviors of cls made
+    (or become) afterwards look its attributes up afresh."""
+    _tables.pop( cls, None )
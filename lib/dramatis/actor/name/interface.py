@@ -1,6 +1,8 @@
 from __future__ import absolute_import
 
 import dramatis
+from dramatis.actor.name.options import Options
+from dramatis.actor.name.options import record
 
 def _func(): pass
 _func = type(_func)
@@ -23,6 +25,7 @@ class Interface(object):
         continue( None ) -> a_name
         continue( "result": function,
                   "exception": function ) -> a_name
+        continue( "timeout": seconds ) -> a_name
 
         When passed a None argument, returns a new actor name with a
         None continuation such that when used in an actor method call,
@@ -43,13 +46,24 @@ class Interface(object):
         method call results in an exception being thrown. Otherwise, the
         runtime will try to deliver exceptions to a dramatis_exception
         actor method if defined. Otherwise it will be recored by the
-        runtime."""
+        runtime.
+
+        The third form keeps the continuation semantics of the name
+        but gives rpcs and futures made through it a timeout: if no
+        answer has arrived seconds after the call is made, the caller
+        gets a dramatis.error.Timeout exception instead and the answer
+        is dropped when (if) it arrives. A timeout can also be added to
+        the second form, where the timeout goes wherever an exception
+        would; a call with a None continuation has nobody to tell and
+        ignores it."""
         
         a = super(dramatis.Actor.Name,self._name).__getattribute__("_actor")
         o = super(dramatis.Actor.Name,self._name).__getattribute__("_options")
         name = self._name = dramatis.Actor.Name(a)
         new_options = o.copy()
         new_options["continuation"] = "none"
+        if ( type(options) == dict and options.keys() == [ "timeout" ] ):
+            new_options["continuation"] = o["continuation"]
         if ( options ):
             if type(options) == _func:
                 new_options["continuation"] = options
@@ -62,9 +76,11 @@ class Interface(object):
                     new_options["nonblocking"] = options["nonblocking"]
                 if options.has_key( "continuation" ):
                     new_options["continuation"] = options["continuation"]
+                if options.has_key( "timeout" ):
+                    new_options["timeout"] = options["timeout"]
         if new_options["continuation"] == None:
             new_options["continuation"] = "none"
-        super(dramatis.Actor.Name,name).__setattr__("_options",new_options)
+        super(dramatis.Actor.Name,name).__setattr__("_options",record(new_options))
         return name
 
     def future(self):
@@ -77,7 +93,49 @@ class Interface(object):
         self._name = dramatis.Actor.Name(a)
         new_options = o.copy()
         new_options["continuation"] = "future"
-        super(dramatis.Actor.Name,self._name).__setattr__("_options",new_options)
+        super(dramatis.Actor.Name,self._name).__setattr__("_options",record(new_options))
+        return self._name
+
+    def stream( self, window ):
+        """Returns a new actor name that when used in an actor method
+        call will return an iterator over the items of the iterable
+        (typically a generator) the method returns, produced at most
+        window items ahead of the caller.
+
+        Usually called via dramatis.stream rather than directly."""
+
+        a = super(dramatis.Actor.Name,self._name).__getattribute__("_actor")
+        o = super(dramatis.Actor.Name,self._name).__getattribute__("_options")
+        self._name = dramatis.Actor.Name(a)
+        new_options = o.copy()
+        new_options["continuation"] = "stream"
+        new_options["window"] = window
+        super(dramatis.Actor.Name,self._name).__setattr__("_options",record(new_options))
+        return self._name
+
+    def priority( self, priority ):
+        """Returns a new actor name that sends calls with the given
+        priority.
+
+        Usually called via dramatis.priority rather than directly."""
+
+        return self._with_option( "priority", priority )
+
+    def deadline( self, seconds ):
+        """Returns a new actor name that sends calls with a deadline
+        the given number of seconds after each is sent.
+
+        Usually called via dramatis.deadline rather than directly."""
+
+        return self._with_option( "deadline", seconds )
+
+    def _with_option( self, key, value ):
+        a = super(dramatis.Actor.Name,self._name).__getattribute__("_actor")
+        o = super(dramatis.Actor.Name,self._name).__getattribute__("_options")
+        self._name = dramatis.Actor.Name(a)
+        new_options = o.copy()
+        new_options[key] = value
+        super(dramatis.Actor.Name,self._name).__setattr__("_options",record(new_options))
         return self._name
 
     def exception( self, exception ):
@@ -109,12 +167,13 @@ class Interface(object):
 
         new_options = o.copy()
         new_options["continuation"] = "none"
-        new_options["continuation_send"] = str(c)
+        new_options["continuation_send"] = c._id
         ct = options.get("call_thread")
         if( ct ):
             new_options["call_thread"] = ct
 
-        super(dramatis.Actor.Name,name).__setattr__("_options",new_options)
+        # no other name sends to c; not worth sharing
+        super(dramatis.Actor.Name,name).__setattr__("_options",Options(new_options))
 
         return name
 
@@ -6,8 +6,14 @@ from traceback import print_stack
 from traceback import extract_stack
 
 from dramatis.actor.name.interface import Interface as _Interface
+from dramatis.actor.name.dispatch import classify
+from dramatis.actor.name.options import record
+
+_rpc = record( { "continuation": "rpc" } )
 
 class PropertyProxy(object):
+    __slots__ = ( "_attr", "_actor", "_options" )
+
     def __init__(self,attr,actor,options):
         super(PropertyProxy,self).__setattr__("_attr",attr)
         super(PropertyProxy,self).__setattr__("_actor",actor)
@@ -27,6 +33,8 @@ class PropertyProxy(object):
         return actor.object_send( attr, args, kwds, options )
 
 class FunctionProxy(object):
+    __slots__ = ( "_attr", "_actor", "_options" )
+
     def __init__(self,attr,actor,options):
         super(FunctionProxy,self).__setattr__("_attr",attr)
         super(FunctionProxy,self).__setattr__("_actor",actor)
@@ -38,11 +46,6 @@ class FunctionProxy(object):
         options = super(FunctionProxy,self).__getattribute__("_options")
         return actor.object_send( attr, args, kwds, options )
 
-_instmeth = type( FunctionProxy.__call__ )
-
-def _func(): pass
-_func = type(_func)
-
 class Name(object):
     """Proxy objects for actors
 
@@ -55,9 +58,13 @@ class Name(object):
     through the dramatis.Actor.Name.Interface object, accessible via
     dramatis.interface."""
 
+    __slots__ = ( "_actor", "_options", "_sends", "_derived" )
+
     def __init__(self,actor):
         super(Name,self).__setattr__("_actor",actor)
-        super(Name,self).__setattr__("_options",{"continuation":"rpc"})
+        super(Name,self).__setattr__("_options",_rpc)
+        super(Name,self).__setattr__("_sends",None)
+        super(Name,self).__setattr__("_derived",None)
 
     def __call__(self,*args,**kwds):
         return self.__getattribute__("__call__")(*args,**kwds)
@@ -69,44 +76,46 @@ class Name(object):
         # logging.warning(FunctionProxy)
         a = super(Name,self).__getattribute__("_actor")
         o = super(Name,self).__getattribute__("_options")
-        t = _func
-        if o.has_key( "continuation_send" ):
-            return FunctionProxy(attr,a,o)
-        if a._behavior == None:
-            return FunctionProxy(attr,a,o)
-
-        # warning( "a: " + str(a) )
-        # warning( "list: " + str( ( a._behavior, ) + a._behavior.__class__.__mro__ ) )
-        for out in ( a._behavior, ) + a._behavior.__class__.__mro__:
-            # print
-            # print repr(out), out.__dict__
+        table = a._dispatch
+        if table is not None and not o.has_key( "continuation_send" ):
+            # an attribute of the behavior itself shadows its class's
             d = None
             try:
-                d = out.__dict__
+                d = a._behavior.__dict__
             except AttributeError: pass
-            # raise AttributeError( "'" + str(out.__class__.__name__) + "' object has no attribute '" + attr + "'" )
             desc = None
             if ( d ):
                 desc = d.get( attr )
             if ( desc ):
-                # print repr(self), "x", repr(attr), type(desc)
-                if ( type(desc) == property ):
-                    return PropertyProxy(attr,a,o).__get__(o,type(o))
-                elif ( type(desc) == _func ) or \
-                      ( type(desc) == _instmeth ):
-                    return FunctionProxy(attr,a,o)
-                elif ( str(type(desc)) == "<type 'wrapper_descriptor'>" ):
-                    return FunctionProxy(attr,a,o)
-                # Honestly, I have not idea ...
-                elif ( str(type(desc)) == "<type 'getset_descriptor'>" ):
-                    return FunctionProxy(attr,a,o)
-                else:
-                    print_stack()
-                    warning(  "hell: type? " + str( type(desc) ) )
-                    raise Exception( "hell: type? " + str( type(desc) ) )
-        # The attribute is not defined (at this time)
-        # The only choice seems to be to assume it's a function
-        return FunctionProxy(attr,a,o)
-
+                kind = classify( desc )
+            else:
+                kind = table[attr]
+            if kind == "property":
+                return PropertyProxy(attr,a,o).__get__(o,type(o))
+        # the proxy only holds the name's actor and options, neither of
+        # which change, so one per attribute does for every call
+        sends = super(Name,self).__getattribute__("_sends")
+        if sends is None:
+            sends = {}
+            super(Name,self).__setattr__("_sends",sends)
+        proxy = sends.get( attr )
+        if proxy is None:
+            proxy = sends[attr] = FunctionProxy(attr,a,o)
+        return proxy
 
     Interface = _Interface
+
+def derived( name, kind, make ):
+    """Returns make( name ), made the first time and kept on name under
+    kind after that.
+
+    Names don't change, so the names made from one the same way, e.g.,
+    by dramatis.release, are interchangeable and one does for all."""
+    names = super(Name,name).__getattribute__("_derived")
+    if names is None:
+        names = {}
+        super(Name,name).__setattr__("_derived",names)
+    result = names.get( kind )
+    if result is None:
+        result = names[kind] = make( name )
+    return result
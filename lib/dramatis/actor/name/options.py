@@ -0,0 +1,33 @@
+from __future__ import absolute_import
+
+from weakref import WeakValueDictionary
+
+class Options(dict):
+    """The options of an actor name: its continuation semantics,
+    priority, deadline, etc.
+
+    Names never change their options, so names with the same options
+    share one record rather than each keeping a dict of its own. The
+    record is read only; copy it to make the options of a new name."""
+
+    __slots__ = ( "__weakref__", )
+
+    def _read_only( self, *args, **kwds ):
+        raise TypeError( "name options are read only" )
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = \
+        update = _read_only
+
+_records = WeakValueDictionary()
+
+def record( options ):
+    """Returns the shared record of options, a dict."""
+    try:
+        key = frozenset( options.iteritems() )
+    except TypeError:
+        # an unhashable option, e.g., a dict; not worth sharing
+        return Options( options )
+    result = _records.get( key )
+    if result is None:
+        result = _records[key] = Options( options )
+    return result
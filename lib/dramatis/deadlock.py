@@ -6,4 +6,8 @@ class Deadlock(Exception):
     This mean there are no executing actors and while there are one or
     more tasks queued for one or more actors, all are gated off. Note
     that case where there are no tasks at all indicates normal
-    termination."""
+    termination.
+
+    It is also raised, without waiting for the runtime to go idle, in
+    the actors of a cycle of blocking calls, each gated off waiting for
+    the next."""
@@ -21,6 +21,13 @@ class Uncaught(Error):
 class Bind(Error):
     """raised when an attempt is made to bind an already-bound actor."""
 
+class Timeout(Error):
+    """Raised in a caller that waited longer than its timeout for the
+    answer to an rpc or the value of a future."""
+
+class Cancelled(Error):
+    """The value of a future that was cancelled before it arrived."""
+
 class Internal(Error): pass
 
 _re_dramatis = re.compile( r'/lib/dramatis/' )
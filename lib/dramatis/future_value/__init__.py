@@ -1,4 +1,5 @@
 from __future__ import absolute_import
 
 from dramatis.future_value.future import Future
+from dramatis.future_value.future import Pipeline
 from dramatis.future_value.interface import Interface
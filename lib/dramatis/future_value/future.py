@@ -9,6 +9,8 @@ import dramatis
 from dramatis.future_value.interface import Interface as _Interface
 
 class PropertyProxy(object):
+    __slots__ = ( "_attr", "_continuation" )
+
     def __init__(self,attr,continuation):
         super(PropertyProxy,self).__setattr__("_attr",attr)
         super(PropertyProxy,self).__setattr__("_continuation",continuation)
@@ -24,6 +26,8 @@ class PropertyProxy(object):
         return c.value.__call__( attr, args, kwds )
 
 class FunctionProxy(object):
+    __slots__ = ( "_attr", "_continuation" )
+
     def __init__(self,attr,continuation):
         # warning( "".join(format_stack()) )
         super(FunctionProxy,self).__setattr__("_attr",attr)
@@ -34,6 +38,18 @@ class FunctionProxy(object):
         c = super(FunctionProxy,self).__getattribute__("_continuation")
         return c.value
 
+class PipelineProxy(object):
+    __slots__ = ( "_attr", "_continuation" )
+
+    def __init__(self,attr,continuation):
+        super(PipelineProxy,self).__setattr__("_attr",attr)
+        super(PipelineProxy,self).__setattr__("_continuation",continuation)
+
+    def __call__(self,*args,**kwds):
+        attr = super(PipelineProxy,self).__getattribute__("_attr")
+        c = super(PipelineProxy,self).__getattribute__("_continuation")
+        return c.pipeline( attr, args )
+
 _instmeth = type( FunctionProxy.__call__ )
 
 from traceback import format_stack
@@ -112,3 +128,28 @@ class Future(object):
         return FunctionProxy(attr,c)
 
     Interface = _Interface
+
+class Pipeline(object):
+    """proxy objects for pipelining calls on the values of futures
+
+    A method called on a dramatis.future_value.Pipeline is a call on the
+    actor name the future will hold. It does not wait for that name:
+    the call is sent by the actor computing the future's value as soon
+    as it returns it, and a dramatis.Future for the call's own value is
+    returned right away. A chain of calls, e.g.,
+
+      server = dramatis.future( server ).connect( password )
+      group = dramatis.pipeline( server ).login( group, user, client )
+
+    so waits for one reply instead of one per call. If the future gets
+    an exception, or a value that is not an actor name, the pipelined
+    future gets the exception (or a dramatis.error.Error) instead.
+
+    Pipelines are made by dramatis.pipeline."""
+
+    def __init__(self,continuation):
+        super(Pipeline,self).__setattr__("_continuation",continuation)
+
+    def __getattribute__(self,attr):
+        c = super(Pipeline,self).__getattribute__("_continuation")
+        return PipelineProxy(attr,c)
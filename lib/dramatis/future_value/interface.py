@@ -39,3 +39,69 @@ class Interface(object):
 
         return super(dramatis.Future,self._future).__getattribute__("_continuation").value
 
+    def add_done_callback( self, function ):
+        """Calls function with the future once its value (or
+        exception) arrives.
+
+        function is run as a continuation task on the calling actor,
+        so, like the result function of a continuation name, it only
+        runs when the actor isn't running anything else, and never
+        while the future is being waited for. Nothing blocks; if the
+        value is already there, function is queued right away."""
+
+        future = self._future
+        c = super(dramatis.Future,future).__getattribute__("_continuation")
+        c.listen( dramatis.runtime.continuation.Block(
+                dramatis.runtime.Scheduler.actor, None,
+                lambda value: function( future ),
+                lambda exception: function( future ) ) )
+
+    def then( self, function ):
+        """Returns a new future for function applied to this future's
+        value.
+
+        function runs, as with add_done_callback, as a continuation
+        task on the calling actor. If the future gets an exception
+        instead of a value, or function raises one, so does the new
+        future. If function returns a future, the new future gets its
+        value, so calls can be chained without blocking:
+
+          dramatis.interface( dramatis.future( a ).f() ).\\
+            then( lambda v: dramatis.future( b ).g( v ) )"""
+
+        return super(dramatis.Future,self._future).__getattribute__("_continuation").then( function )
+
+    def pipeline( self ):
+        """Returns a dramatis.future_value.Pipeline for the future: methods
+        called on it are sent to the actor name that will be the
+        future's value without waiting for it. Usually called via
+        dramatis.pipeline rather than directly."""
+
+        return dramatis.future_value.future.Pipeline(
+            super(dramatis.Future,self._future).__getattribute__("_continuation") )
+
+    def cancel( self ):
+        """Cancels the call that will produce the future's value.
+
+        If the call is still queued, it is removed from the callee's
+        queue; if it is running, the callee can find out through
+        self.actor.cancelled and stop early. Either way, the value of
+        the future becomes a dramatis.error.Cancelled exception.
+        Returns false, changing nothing, if the value had already
+        arrived."""
+
+        return super(dramatis.Future,self._future).__getattribute__("_continuation").cancel()
+
+    def get( self, timeout = None ):
+        """Returns the native value of the future, like value, waiting
+        at most timeout seconds for it.
+
+        If the value hasn't arrived by then, the future's value becomes
+        a dramatis.error.Timeout exception, which is raised; a value
+        that arrives later is dropped."""
+
+        c = super(dramatis.Future,self._future).__getattribute__("_continuation")
+        if timeout is not None and not c.ready:
+            c.expire( timeout )
+        return c.value
+
@@ -1,9 +1,13 @@
 from __future__ import absolute_import
 
 from dramatis.runtime.gate import Gate
+from dramatis.runtime.mailbox import Mailbox
 from dramatis.runtime.runtime import Runtime
 from dramatis.runtime.scheduler import Scheduler
+from dramatis.runtime.loop_scheduler import LoopScheduler
 from dramatis.runtime.task import Task
 from dramatis.runtime.actor import Actor
 from dramatis.runtime.thread_pool import ThreadPool
+from dramatis.runtime.wait_graph import WaitGraph
 
+from dramatis.runtime.shards import Shards
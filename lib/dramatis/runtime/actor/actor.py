@@ -5,15 +5,26 @@ from threading import Lock
 from threading import currentThread
 
 from sys import exc_info
+from types import GeneratorType
 from traceback import print_exc
 
 import dramatis
 import dramatis.runtime
+from dramatis.runtime.scheduler import _local
 
 class Actor(object):
+    __slots__ = ( "state", "priority", "deadline", "_behavior",
+                  "_interface", "_gate", "_queue", "_mutex",
+                  "_continuations", "_call_thread",
+                  "_call_threading_enabled", "_caller_runs", "_throughput",
+                  "_dispatch", "_name", "_nil" )
 
     def __init__(self,behavior = None):
         self._call_threading_enabled = False
+        self._caller_runs = False
+        self._throughput = None
+        self.priority = 0
+        self.deadline = None
         self._call_thread = None
         self._behavior = behavior
         self._gate = dramatis.runtime.Gate()
@@ -24,15 +35,14 @@ class Actor(object):
             if isinstance(behavior,dramatis.Actor.Behavior):
                 if behavior.actor.name:
                     raise dramatis.error.Bind( "behavior already bound" )
-                oi = self._interface
-                class actor_class ( behavior.__class__.__bases__[0] ):
-                    @property
-                    def actor( cls ):
-                        return oi
-                behavior.__class__ = actor_class
+                dramatis.actor.behavior.bind( behavior, self._interface )
+        self._dispatch = None
+        if behavior:
+            self._dispatch = dramatis.actor.name.dispatch.table( type(behavior) )
         self._gate.always( ( [ "object", "dramatis_exception" ] ), True )
         self.block()
-        self._queue = []
+        self._queue = dramatis.runtime.Mailbox(
+            dramatis.runtime.Scheduler.current._policy )
         self._mutex = Lock()
         self._continuations = {}
         dramatis.runtime.Scheduler.current.append( self )
@@ -45,21 +55,12 @@ class Actor(object):
         if isinstance( behavior, dramatis.Actor.Behavior ):
             if behavior.actor.name:
                 raise dramatis.error.Bind( "cannot become bound behavior" )
-            new_oi = self._interface
-            class actor_class ( behavior.__class__.__bases__[0] ):
-                @property
-                def actor( cls ):
-                    return new_oi
-            behavior.__class__ = actor_class
+            dramatis.actor.behavior.bind( behavior, self._interface )
 
         if isinstance( self._behavior, dramatis.Actor.Behavior ):
-            old_oi = dramatis.Actor.Interface( None )
-            class actor_class ( self._behavior.__class__.__bases__[0] ):
-                @property
-                def actor( cls ):
-                    return old_oi
-            self._behavior.__class__ = actor_class
+            dramatis.actor.behavior.bind( self._behavior, None )
         self._behavior = behavior
+        self._dispatch = dramatis.actor.name.dispatch.table( type(behavior) )
         if hasattr(behavior,"dramatis_bound"):
             behavior.dramatis_bound()
         self.schedule()
@@ -70,6 +71,14 @@ class Actor(object):
             self._name = dramatis.Actor.Name( self )
         return self._name
 
+    @property
+    def nil(self):
+        # the continuation of the calls this actor releases. It only
+        # holds the actor's name, so the calls can all share one
+        if( not hasattr(self,"_nil") ):
+            self._nil = dramatis.runtime.continuation.Nil( self.name, None )
+        return self._nil
+
     @property
     def runnable(self):
         # warning( "runnable? " + str(self) + " " + self.state )
@@ -77,6 +86,21 @@ class Actor(object):
 
     behavior = property( lambda(self): self._behavior )
 
+    # the continuation of the call being delivered. Kept per thread:
+    # a thread woken from an rpc can be back in the actor's method
+    # while the thread that woke it is still finishing its delivery
+    def _get_delivering( self ):
+        return _local.dramatis_delivering
+
+    def _set_delivering( self, v ):
+        _local.dramatis_delivering = v
+
+    _delivering = property( _get_delivering, _set_delivering )
+
+    @property
+    def cancelled(self):
+        return getattr( self._delivering, "_cancelled", False )
+
     def _set_call_threading_enabled( self, v ):
         self._call_threading_enabled = v
 
@@ -84,10 +108,29 @@ class Actor(object):
         lambda(self): self._call_threading_enabled,
         lambda(self,v): self._set_call_threading_enabled(v) )
 
+    def _set_caller_runs( self, v ):
+        self._caller_runs = v
+
+    def _get_throughput( self ):
+        if self._throughput:
+            return self._throughput
+        return dramatis.Runtime.current.throughput
+
+    def _set_throughput( self, v ):
+        self._throughput = v
+
+    throughput = property( _get_throughput, _set_throughput )
+
     def make_runnable(self):
         # warning( "make_runnable "  + str(self) + " " )
         self.state = "runnable"
 
+    @property
+    def awaiting(self):
+        # gated on a wait, e.g., a coroutine's, even if the task that
+        # started it is still finishing
+        return self._gate.is_awaiting()
+
     def is_blocked(self):
         # warning( "blocked? "   + str(self) + " " + self.state )
         return self.state == "blocked"
@@ -106,7 +149,7 @@ class Actor(object):
         t = None
         args = (name,)+args
         o = opts.get("continuation_send")
-        if o:
+        if o is not None:
             t = "continuation"
             args = (o,)+args
         else:
@@ -119,23 +162,42 @@ class Actor(object):
 
         task = dramatis.runtime.Task( self, dest, args, opts  )
 
+        delay = opts.get("delay")
+        if delay:
+            dramatis.runtime.Scheduler.current.timers.after(
+                delay, lambda: self.enqueue( task ) )
+        else:
+            self.enqueue( task )
+
+        v = task.queued()
+        # warning( "returning " + str(v) )
+        return v
+
+    def enqueue( self, task ):
+        inline = False
         with self._mutex:
             if ( not self.runnable and
                  ( self._gate.accepts(  *( ( task.dest, task.method ) + task.arguments ) ) or self.current_call_thread( task.call_thread ) ) ):
                 self.make_runnable()
-                dramatis.runtime.Scheduler.current.schedule( task )
+                # caller runs: a blocking call on an idle actor runs
+                # on the calling thread, which holds the actor just
+                # as a worker would
+                inline = self._caller_runs and task.inline()
+                if not inline:
+                    dramatis.runtime.Scheduler.current.schedule( task )
             else:
                 self._queue.append(task)
 
-        v = task.queued()
-        # warning( "returning " + str(v) )
-        return v
+        if inline:
+            dramatis.runtime.Scheduler.current.deliver_inline( task )
 
     def deliver( self, dest, args, continuation, call_thread ):
         old_call_thread = self._call_thread
+        old_delivering = self._delivering
         old_behavior = self._behavior
         try:
             self._call_thread = call_thread
+            self._delivering = continuation
             method = args[0]
             args = args[1:]
             result = None
@@ -144,7 +206,19 @@ class Actor(object):
                 result = self.__getattribute__(method).__call__( *args )
             elif ( dest == "object" ):
                 # warning( "before call " + str(self._behavior) + " " + str( self._behavior.__getattribute__(method) ) )
-                v = self._behavior.__getattribute__(method).__call__( *args )
+                function = self._behavior.__getattribute__(method)
+                v = function.__call__( *args )
+                if isinstance( continuation,
+                               dramatis.runtime.continuation.Stream ):
+                    # the stream answers the call, an item at a time
+                    continuation.produce( self, v )
+                    return
+                if( type(v) is GeneratorType and
+                    getattr( function, "dramatis_coroutine", False ) ):
+                    # the generator answers the continuation itself
+                    dramatis.runtime.continuation.Generator(
+                        self, v, continuation, call_thread ).start()
+                    return
                 if v is self._behavior:
                     v = self.name
                 result = v
@@ -164,22 +238,29 @@ class Actor(object):
                     old_behavior = None
                 del self._continuations[ continuation_name ]
             else: raise "hell 1: " + str(self._dest)
-            continuation.result( result )
+            if self._delivering is continuation:
+                continuation.result( result )
         except Exception, exception:
             try:
                 # warning( "trying to except " + repr(exception) )
                 # print_exc()
                 dramatis.error.traceback( exception ).set( exc_info()[2] )
-                continuation.exception( exception )
+                if self._delivering is continuation:
+                    continuation.exception( exception )
+                else:
+                    # the call was forwarded; whoever it went to
+                    # answers the caller
+                    dramatis.Runtime.current.exception( exception )
             except Exception, e:
                 # warning( "double exception fault: " + repr(e) )
                 # print_exc()
                 raise e
         finally:
             self._call_thread = old_call_thread
+            self._delivering = old_delivering
             # warning( "final schedule " + str( self._behavior ) )
             if old_behavior is self._behavior:
-                self.schedule()
+                self.schedule( drain = True )
             # warning( "after final schedule " + str( self._behavior ) )
 
     def object_initialize( self, *args ):
@@ -188,9 +269,13 @@ class Actor(object):
 
     def actor_yield(self): pass
 
+    def stream( self, stream ):
+        stream.run()
+
     def bind( self, behavior ):
         if self._behavior: raise dramatis.error.Bind()
         self._behavior = behavior
+        self._dispatch = dramatis.actor.name.dispatch.table( type(behavior) )
         self._gate.accept( "object" )
         self.schedule()
         return self.name
@@ -202,34 +287,68 @@ class Actor(object):
             dramatis.Runtime.current.exception( exception )
         return self
 
-    def deadlock( self, exception ):
-        tasks = []
-        with self._mutex:
-            tasks = list(self._queue)
-            self._queue[:] = []
+    def deadlock( self, exception, tasks = None ):
+        if tasks is None:
+            tasks = self.drain()
         for task in tasks:
             try:
                 task.exception( exception )
             except Exception, e:
                 raise e
 
+    def drain( self ):
+        with self._mutex:
+            return self._queue.drain()
+
+    def forward( self, name ):
+        """Returns name with the continuation of the call being
+        delivered, which this actor then no longer answers."""
+        continuation = self._delivering
+        if continuation is None:
+            raise dramatis.error.Error( "no call to forward" )
+        self._delivering = None
+        if getattr( continuation, "_inline", False ):
+            # the caller ran the call on its own thread; it now waits
+            # for the answer like any other caller
+            continuation._inline = False
+        return dramatis.interface( name )._with_option( "continuation",
+                                                        continuation )
+
+    def withdraw( self, task ):
+        """Removes task from the queue, if it is still there."""
+        with self._mutex:
+            return self._queue.remove( task )
+
+    def handoff( self, c, method, value ):
+        """Hands a result or exception straight to a thread blocked
+        on continuation c.
+
+        Returns False, leaving the caller to send a continuation task
+        as usual, unless the actor is idle and the gate would accept
+        the continuation task. The woken thread then owns the actor,
+        just as if the continuation task had been delivered."""
+        tag = c._id
+        with self._mutex:
+            if( self.runnable or tag not in self._continuations or
+                not self._gate.accepts( "continuation", tag, method, value ) ):
+                return False
+            self.make_runnable()
+            del self._continuations[tag]
+        if( method == "result" ):
+            c.continuation_result( value )
+        else:
+            c.continuation_exception( value )
+        return True
+
     def register_continuation( self, c ):
-        self._continuations[str(c)] = c
+        self._continuations[c._id] = c
 
-    def schedule( self, continuation = None ):
+    def schedule( self, continuation = None, drain = False ):
         with self._mutex:
-            task = None
-            index = 0
-            while task == None and index < len(self._queue):
-                candidate = self._queue[index]
-                if( self._gate.accepts( *( ( candidate.dest, candidate.method ) + candidate.arguments ) ) or 
-                    self.current_call_thread( candidate.call_thread ) ):
-                    task = candidate
-                    self._queue.pop(index)
-                index += 1
+            task = self._queue.take( self._gate, self._call_thread )
             if( task ):
                 # warning( "schedule next " + str(  task ) )
-                dramatis.runtime.Scheduler.current.schedule( task )
+                dramatis.runtime.Scheduler.current.schedule( task, drain )
             else:
                 # warning( "schedule block " + str(self) )
                 self.block()
@@ -7,10 +7,22 @@ from threading import Condition
 
 from traceback import print_exc
 
+from sys import exc_info
+
+from collections import deque
+from itertools import count
+
 import dramatis
 from dramatis.runtime import Scheduler
 
+# continuations, and the call threads that tasks start, are numbered
+# from one runtime-wide sequence. The ids tag the gate entries of
+# waits and key the actors' tables of outstanding continuations, so
+# nothing on the call path formats a repr. (count's next is atomic.)
+next_id = count( 1 ).next
+
 class Nil(object):
+    __slots__ = ( "_name", )
 
     def __init__(self,name,call_thread):
         self._name = name
@@ -27,13 +39,22 @@ class Nil(object):
             raise e
     
 class RPC(object):
+    __slots__ = ( "_actor", "_answered", "_blocking", "_call_thread",
+                  "_id", "_inline", "_mutex", "_state", "_task", "_timers",
+                  "_type", "_value", "_wait", "_waiter" )
 
-    def __init__(self,name,call_thread,nonblocking):
+    def __init__(self,name,call_thread,nonblocking,task):
+        self._id = next_id()
         self._state = "start"
+        self._task = task
+        self._waiter = None
+        self._answered = False
+        self._timers = []
         self._mutex = Lock()
         self._wait = Condition( self._mutex )
         self._call_thread = call_thread
         self._blocking = not nonblocking
+        self._inline = False
         self._actor = \
             dramatis.interface( Scheduler.actor ).\
               _continuation( self, { call_thread: call_thread } )
@@ -52,22 +73,21 @@ class RPC(object):
                 actor = super(dramatis.Actor.Name,self._actor).\
                     __getattribute__("_actor")
                 try:
-                    tag = str(self)
+                    tag = self._id
                     call_thread = self._call_thread
                     actor._call_thread = call_thread
                     if self._blocking:
-                        actor._gate.only( [ "continuation", tag ],
-                                          { "tag": tag } )
+                        actor._gate.awaiting( tag )
                     actor.schedule( self )
-                    Scheduler.current.suspend_notification( self )
-                    self._wait.wait()
+                    if self._blocking:
+                        Scheduler.current.wait_notification( actor, self )
+                    Scheduler.current.suspend( self )
                     # this causes a deadlock if the waking thread,
                     # which may be retiring, does so before this
                     # thead has awakend and notified the scheduler
                     # sleep 1
                 finally:
-                    tag = str(self)
-                    actor._gate.default_by_tag( tag )
+                    actor._gate.default_by_tag( self._id )
                 if( self._state != "done" ):
                     raise "hell"
 
@@ -80,12 +100,50 @@ class RPC(object):
             dramatis.error.traceback( self._value )
             raise self._value
 
+    def inline( self ):
+        if not self._blocking:
+            return False
+        self._inline = True
+        return True
+
+    def expire( self, seconds ):
+        """Answers the call with dramatis.error.Timeout if it hasn't
+        been answered seconds from now."""
+        self._timers.append(
+            Scheduler.current.timers.after( seconds, _Expiry( self ) ) )
+
     def result( self, result ):
         # warning( "result " + str(result) + " " + str(self._actor) )
-        self._actor.result( result )
+        if not _answer( self ):
+            return
+        if not self._handoff( "result", result ):
+            self._actor.result( result )
 
     def exception( self, exception ):
-        self._actor.exception( exception )
+        if not _answer( self ):
+            return
+        if not self._handoff( "exception", exception ):
+            self._actor.exception( exception )
+
+    def _handoff( self, method, value ):
+        if self._inline:
+            # the caller's thread ran the call and is still running
+            # the caller; queued will find the value
+            actor = super(dramatis.Actor.Name,self._actor).\
+                __getattribute__("_actor")
+            actor._continuations.pop( self._id, None )
+            if( method == "result" ):
+                self.continuation_result( value )
+            else:
+                self.continuation_exception( value )
+            return True
+        # a blocked caller is woken directly rather than through a
+        # continuation task in its mailbox
+        if not self._blocking or self._state != "waiting":
+            return False
+        actor = super(dramatis.Actor.Name,self._actor).\
+            __getattribute__("_actor")
+        return actor.handoff( self, method, value )
 
     def continuation_result( self, result ):
         # warning( "c result " + str(result) )
@@ -114,9 +172,16 @@ class RPC(object):
 
 
 class Block( object ):
+    __slots__ = ( "_answered", "_continuation", "_exception_block", "_id",
+                  "_name", "_result_block", "_task", "_timers", "_waiter" )
 
-    def __init__(self, name, call_thread, result, exception):
+    def __init__(self, name, call_thread, result, exception, task = None):
         # p "p.n #{call_thread} #{result} #{except}"
+        self._id = next_id()
+        self._answered = False
+        self._task = task
+        self._timers = []
+        self._waiter = None
         self._result_block = result
         self._exception_block = exception
         self._name = name
@@ -125,11 +190,22 @@ class Block( object ):
               ._continuation( self, { call_thread: call_thread } )
 
     def queued(self): pass
+
+    def expire( self, seconds ):
+        """Calls the exception function (or dramatis_exception) with
+        dramatis.error.Timeout if the call hasn't been answered seconds
+        from now."""
+        self._timers.append(
+            Scheduler.current.timers.after( seconds, _Expiry( self ) ) )
     
     def result(self, result):
+        if not _answer( self ):
+            return
         self._continuation.result( result )
     
     def exception(self, exception):
+        if not _answer( self ):
+            return
         self._continuation.exception( exception )
 
     def continuation_result(self, result):
@@ -144,9 +220,25 @@ class Block( object ):
         return False
 
 class Future(object):
+    __slots__ = ( "_actor", "_answered", "_blocks", "_call_thread",
+                  "_calls", "_cancelled", "_chain", "_generator", "_id",
+                  "_mutex", "_outcome", "_state", "_task", "_timers",
+                  "_type", "_value", "_wait", "_waiter" )
 
-    def __init__(self,name,call_thread):
+    def __init__(self,name,call_thread,task):
+        self._id = next_id()
         self._state = "start"
+        self._generator = None
+        self._task = task
+        self._waiter = None
+        self._answered = False
+        self._cancelled = False
+        self._timers = []
+        self._blocks = []
+        self._chain = None
+        # calls pipelined on the value, until it is known
+        self._calls = []
+        self._outcome = None
         self._mutex = Lock()
         self._wait = Condition( self._mutex )
         self._call_thread = call_thread
@@ -165,25 +257,32 @@ class Future(object):
     @property
     def value(self):
         with self._mutex:
-            if( self._state == "start" ):
+            if( self._state == "start" or self._state == "resuming" ):
+                # a group that was waiting for this future may still
+                # be listening; it finds the value when it next looks
+                self._generator = None
                 self._state = "waiting"
                 actor = super(dramatis.Actor.Name,self._actor).\
                     __getattribute__("_actor")
                 try:
-                    tag = str(self)
+                    tag = self._id
                     call_thread = self._call_thread
                     actor._call_thread = call_thread
-                    actor._gate.only( [ "continuation", tag ], { "tag": tag } )
+                    if self._chain is not None:
+                        # a future made by then: the continuations that
+                        # run the chain's functions have to get in too
+                        actor._gate.awaiting( self._chain )
+                    else:
+                        actor._gate.awaiting( tag )
                     actor.schedule( self )
-                    Scheduler.current.suspend_notification( self )
-                    self._wait.wait()
+                    Scheduler.current.wait_notification( actor, self )
+                    Scheduler.current.suspend( self )
                     # this causes a deadlock if the waking thread,
                     # which may be retiring, does so before this
                     # thead has awakend and notified the scheduler
                     # sleep 1
                 finally:
-                    tag = str(self)
-                    actor._gate.default_by_tag( tag )
+                    actor._gate.default_by_tag( self._id )
                 if( self._state != "done" ):
                     raise "hell"
 
@@ -195,36 +294,506 @@ class Future(object):
                 # self._value.set_traceback()
             raise self._value
 
+    def cancel( self ):
+        """Sets the value to dramatis.error.Cancelled if it hasn't
+        arrived. The call is withdrawn if it is still queued;
+        otherwise the callee can see that it was cancelled. Returns
+        False if the value had already arrived."""
+        if not _answer( self ):
+            return False
+        task = self._task
+        if task is None:
+            # a future made by then
+            self._actor.exception( dramatis.error.Cancelled( "cancelled" ) )
+            return True
+        if not task.actor.withdraw( task ):
+            self._cancelled = True
+        self._actor.exception(
+            dramatis.error.Cancelled( "cancelled " + task.method ) )
+        return True
+
+    def listen( self, block ):
+        """Has block, a Block or Future continuation, answered with the
+        value when it arrives, or right away if it already has."""
+        with self._mutex:
+            if( self._state != "done" and self._state != "signaled" ):
+                self._blocks.append( block )
+                return
+        self._answer_block( block )
+
+    def then( self, function ):
+        """Returns a future for function applied to the value, called
+        on the current actor when the value arrives. An exception
+        instead of a value is passed on; if function returns a
+        future, the new future gets its value."""
+        chained = Future( Scheduler.actor, None, None )
+        # the tags of the futures and function continuations along the
+        # chain, for value to wait on. Each future made by then has a
+        # set of its own: waiting on one mustn't let in the functions
+        # of its siblings
+        chained._chain = set( self._chain or () )
+        chained._chain.update( ( self._id, chained._id ) )
+        def result( value ):
+            try:
+                value = function( value )
+            except Exception, exception:
+                dramatis.error.traceback( exception ).set( exc_info()[2] )
+                chained.exception( exception )
+                return
+            if type(value) is dramatis.Future:
+                c = super(dramatis.Future,value).\
+                    __getattribute__("_continuation")
+                chained._chain.add( c._id )
+                if c._chain is not None:
+                    chained._chain.update( c._chain )
+                c.listen( chained )
+            else:
+                chained.result( value )
+        block = Block( Scheduler.actor, None, result, chained.exception )
+        chained._chain.add( block._id )
+        self.listen( block )
+        return chained.queued()
+
+    def pipeline( self, method, args ):
+        """Returns a future for calling method, with args, on the actor
+        name that will be the value. The call is sent by the thread
+        that answers this future, as soon as it does, instead of after
+        the value has come back to the caller."""
+        pipelined = Future( Scheduler.actor, self._call_thread, None )
+        with self._mutex:
+            if self._outcome is None:
+                self._calls.append( ( pipelined, method, args ) )
+                return pipelined.queued()
+        self._forward( pipelined, method, args )
+        return pipelined.queued()
+
+    def _pipelined( self, type, value ):
+        with self._mutex:
+            self._outcome = ( type, value )
+            calls, self._calls = self._calls, []
+        for call in calls:
+            self._forward( *call )
+
+    def _forward( self, pipelined, method, args ):
+        kind, value = self._outcome
+        if kind != "return":
+            pipelined.exception( value )
+            return
+        if pipelined._answered:
+            # e.g., cancelled while waiting for the value
+            return
+        try:
+            if not type(value) is dramatis.Actor.Name:
+                raise dramatis.error.Error( "cannot pipeline " + method +
+                                            " to a value that is not " +
+                                            "an actor name" )
+            actor = super(dramatis.Actor.Name,value).\
+                __getattribute__("_actor")
+            options = super(dramatis.Actor.Name,value).\
+                __getattribute__("_options").copy()
+            options.pop( "continuation_send", None )
+            options["continuation"] = pipelined
+            actor.object_send( method, args, None, options )
+        except Exception, exception:
+            dramatis.error.traceback( exception ).set( exc_info()[2] )
+            pipelined.exception( exception )
+
+    def _answer_block( self, block ):
+        if( self._type == "return" ):
+            block.result( self._value )
+        else:
+            block.exception( self._value )
+
+    def expire( self, seconds ):
+        """Sets the value to dramatis.error.Timeout if it hasn't
+        arrived seconds from now."""
+        self._timers.append(
+            Scheduler.current.timers.after( seconds, _Expiry( self ) ) )
+
     def result( self, result ):
         # warning( "result " + str(result) + " " + str(self._actor) )
+        if not _answer( self ):
+            return
+        self._pipelined( "return", result )
         self._actor.result( result )
 
     def exception( self, exception ):
+        if not _answer( self ):
+            return
+        self._pipelined( "exception", exception )
         self._actor.exception( exception )
 
+    def resume( self, generator ):
+        """Has generator (or a Group) resumed with the value instead
+        of blocking a thread on it. Returns False if the value has
+        already arrived."""
+        with self._mutex:
+            if( self._state == "done" or self._state == "signaled" ):
+                return False
+            self._state = "resuming"
+            self._generator = generator
+            return True
+
     def continuation_result( self, result ):
         # warning( "c result " + str(result) )
+        return self._signal( "return", result )
+
+    def continuation_exception( self, exception ):
+        return self._signal( "exception", exception )
+
+    def _signal( self, type, value ):
+        # returns True if a waiting thread now owns the actor
+        generator = None
+        woken = False
         with self._mutex:
-            self._type = "return"
-            self._value = result
+            self._type = type
+            self._value = value
+            blocks, self._blocks = self._blocks, []
             if self._state == "start":
                 self._state = "signaled"
+            elif self._state == "resuming":
+                self._state = "done"
+                generator = self._generator
             else:
                 self._state = "done"
                 dramatis.runtime.Scheduler.current.wakeup_notification( self )
                 self._wait.notify()
-        return False
-
-    def continuation_exception( self, exception ):
+                woken = True
+        for block in blocks:
+            self._answer_block( block )
+        if generator:
+            return bool( generator.resume( self ) )
+        return woken
+
+class Group(object):
+    """Waits for any number of a set of futures at once.
+
+    The futures are listened to as a generator listens to the future
+    it yields. The caller is suspended once, gated on all the futures
+    still pending, until enough of them have values, rather than once
+    per future. Futures made by other actors are waited for one at a
+    time, once those that have already arrived have been counted."""
+
+    __slots__ = ( "_arrived", "_count", "_futures", "_id", "_mutex",
+                  "_pending", "_state", "_wait" )
+
+    def __init__( self, futures ):
+        self._id = next_id()
+        self._mutex = Lock()
+        self._wait = Condition( self._mutex )
+        self._state = "start"
+        self._futures = {}
+        self._pending = set()
+        self._arrived = deque()
+        self._count = 0
+        for future in futures:
+            c = super(dramatis.Future,future).__getattribute__("_continuation")
+            self._futures[c] = future
+            self._pending.add( c )
+
+    def __len__( self ):
+        return len(self._pending) + len(self._arrived)
+
+    def take( self, count ):
+        """Waits until at least count futures (or all of them) have
+        values, then returns count of those, as dramatis.Futures, in
+        the order they arrived, forgetting them."""
+        count = min( count, len(self) )
+        actor = super(dramatis.Actor.Name,Scheduler.actor).\
+            __getattribute__("_actor")
+        # listen to our own futures, and see which of the others are
+        # in, before blocking on any of the others
+        foreign = []
         with self._mutex:
-            self._type = "exception"
-            self._value = exception
-            if self._state == "start":
-                self._state = "signaled"
-            else:
+            for c in list(self._pending):
+                if( super(dramatis.Actor.Name,c._actor).\
+                        __getattribute__("_actor") is not actor ):
+                    foreign.append( c )
+                elif not c.resume( self ):
+                    self._pending.discard( c )
+                    self._arrived.append( c )
+        foreign.sort( key = lambda c: not c.ready )
+        for c in foreign:
+            with self._mutex:
+                if len(self._arrived) >= count:
+                    break
+            try:
+                c.value
+            except Exception: pass
+            with self._mutex:
+                self._pending.discard( c )
+                self._arrived.append( c )
+        with self._mutex:
+            for c in list(self._pending):
+                if not c.resume( self ):
+                    self._pending.discard( c )
+                    self._arrived.append( c )
+            if len(self._arrived) < count:
+                self._state = "waiting"
+                self._count = count
+                tags = [ c._id for c in self._pending ]
+                try:
+                    actor._gate.awaiting( *tags )
+                    actor.schedule( self )
+                    for c in list(self._pending):
+                        Scheduler.current.wait_notification( actor, c )
+                    Scheduler.current.suspend( self )
+                finally:
+                    actor._gate.default_by_tag( tags[0] )
+                    # the futures still pending aren't waited for now
+                    for c in self._pending:
+                        Scheduler.current.unwait_notification( c )
+            return [ self._futures.pop( self._arrived.popleft() )
+                     for i in xrange(count) ]
+
+    def resume( self, future ):
+        # called, on the thread delivering the future's value, by the
+        # future; returns True if the woken caller now owns the actor
+        with self._mutex:
+            if future not in self._pending:
+                return False
+            self._pending.discard( future )
+            self._arrived.append( future )
+            if( self._state == "waiting" and
+                len(self._arrived) >= self._count ):
                 self._state = "done"
-                dramatis.runtime.Scheduler.current.wakeup_notification( self )
+                Scheduler.current.wakeup_notification( self )
                 self._wait.notify()
+                return True
+            return False
+
+class Stream(object):
+    """Streams the items of an iterable returned by an actor method.
+
+    The caller gets an iterator right away. The callee's actor pulls
+    items from the iterable and hands them over as they come, but runs
+    at most window items ahead of the caller: each item the caller
+    takes is a credit for one more. When the credits run out the
+    producer stops, releasing the actor, and is sent back to it, as a
+    task, once the caller catches up.
+
+    An item that hasn't arrived yet is waited for as a future would
+    be, with rpc gating semantics. An exception raised by the method
+    or the iterable is raised by the iterator, which then stops."""
+
+    __slots__ = ( "_actor", "_buffer", "_call_thread", "_closed",
+                  "_credits", "_iterator", "_mutex", "_name", "_paused",
+                  "_task", "_waiting" )
+
+    def __init__( self, name, call_thread, task, window ):
+        if window < 1:
+            raise dramatis.error.Error( "stream window must be positive" )
+        self._name = name
+        self._call_thread = call_thread
+        self._task = task
+        self._credits = window
+        self._buffer = deque()
+        self._waiting = None
+        self._actor = None
+        self._iterator = None
+        self._paused = False
+        self._closed = False
+        self._mutex = Lock()
+
+    def queued( self ):
+        return self._items()
+
+    def produce( self, actor, iterable ):
+        """Starts pulling items from iterable; called on actor, the
+        callee, in place of answering the call."""
+        self._iterator = iter( iterable )
+        self._actor = actor
+        self.run()
+
+    def run( self ):
+        # runs on the producing actor until the credits run out
+        while True:
+            with self._mutex:
+                if self._closed:
+                    close = getattr( self._iterator, "close", None )
+                    break
+                if self._credits == 0:
+                    self._paused = True
+                    return
+                self._credits -= 1
+            try:
+                item = self._iterator.next()
+            except StopIteration:
+                self._put( "end", None )
+                return
+            except Exception, exception:
+                dramatis.error.traceback( exception ).set( exc_info()[2] )
+                self._put( "exception", exception )
+                return
+            self._put( "return", item )
+        if close:
+            close()
+
+    def result( self, result ):
+        # a call that wasn't to a method of the behavior, e.g., a
+        # property: a stream of the one value
+        self._put( "return", result )
+        self._put( "end", None )
+
+    def exception( self, exception ):
+        self._put( "exception", exception )
+
+    def _put( self, kind, value ):
+        with self._mutex:
+            waiting, self._waiting = self._waiting, None
+            if not waiting:
+                self._buffer.append( ( kind, value ) )
+        if waiting:
+            waiting.result( ( kind, value ) )
+
+    def _take( self ):
+        with self._mutex:
+            if self._buffer:
+                entry = self._buffer.popleft()
+                waiting = None
+            else:
+                waiting = self._waiting = \
+                    Future( self._name, self._call_thread, self._task )
+        if waiting:
+            entry = waiting.value
+        self._credit()
+        return entry
+
+    def _credit( self ):
+        with self._mutex:
+            self._credits += 1
+            resume = self._paused
+            self._paused = False
+        if resume:
+            self._resume()
+
+    def _resume( self ):
+        self._actor.actor_send( [ "stream", self ],
+                                { "continuation": "none" } )
+
+    def _close( self ):
+        with self._mutex:
+            self._closed = True
+            resume = self._paused
+            self._paused = False
+        if resume:
+            # the producer closes its iterable itself, on its actor
+            self._resume()
+
+    def _items( self ):
+        try:
+            while True:
+                kind, value = self._take()
+                if kind == "end":
+                    return
+                if kind == "exception":
+                    raise value
+                yield value
+        finally:
+            self._close()
+
+def _answer( continuation ):
+    # only the first answer to an rpc, block or future counts; a late
+    # one, e.g., after a timeout, is dropped
+    if not Scheduler.current.answer_notification( continuation ):
         return False
+    for timer in continuation._timers:
+        timer.cancel()
+    return True
+
+class _Expiry(object):
+    __slots__ = ( "actor", "_continuation" )
+
+    # scheduled by the timer when an rpc, block or future times out;
+    # answers it, as the callee, with a timeout. A future made by then
+    # or pipeline has no call of its own and is answered as its actor.
+
+    def __init__( self, continuation ):
+        task = continuation._task
+        if task is not None:
+            self.actor = task.actor
+        else:
+            self.actor = super(dramatis.Actor.Name,continuation._actor).\
+                __getattribute__("_actor")
+        self._continuation = continuation
+
+    def __call__( self ):
+        Scheduler.current.schedule( self )
+
+    def deliver( self ):
+        task = self._continuation._task
+        if task is None:
+            self._continuation.exception(
+                dramatis.error.Timeout( "timed out waiting for a future" ) )
+            return
+        # the callee doesn't need to run a call nobody waits for
+        task.actor.withdraw( task )
+        self._continuation.exception(
+            dramatis.error.Timeout( "timed out waiting for " + task.method ) )
+
+class Generator(object):
+    """Runs an actor method written as a generator and marked with
+    dramatis.coroutine.
+
+    Each time the method yields a future, the actor gates as if it
+    were blocked in an rpc on that future but the delivering thread
+    is released; the generator is resumed, on whichever thread
+    delivers the future's value, with that value (or the exception).
+    The first value yielded that is not a future is the result of the
+    method, as is None if the generator finishes."""
+
+    __slots__ = ( "_actor", "_call_thread", "_continuation", "_generator" )
+
+    def __init__( self, actor, generator, continuation, call_thread ):
+        self._actor = actor
+        self._generator = generator
+        self._continuation = continuation
+        self._call_thread = call_thread
+
+    def start( self ):
+        self._step( "return", None )
+
+    def resume( self, future ):
+        self._actor._gate.default_by_tag( future._id )
+        self._actor._call_thread = self._call_thread
+        self._actor._delivering = self._continuation
+        self._step( future._type, future._value )
+
+    def _step( self, kind, value ):
+        while True:
+            try:
+                if( kind == "return" ):
+                    v = self._generator.send( value )
+                else:
+                    v = self._generator.throw( value )
+            except StopIteration:
+                if self._actor._delivering is self._continuation:
+                    self._continuation.result( None )
+                return
+            except Exception, exception:
+                dramatis.error.traceback( exception ).set( exc_info()[2] )
+                self._continuation.exception( exception )
+                return
+            if( type(v) is not dramatis.Future ):
+                self._generator.close()
+                if self._actor._delivering is self._continuation:
+                    # i.e., the call wasn't forwarded
+                    self._continuation.result( v )
+                return
+            future = super(dramatis.Future,v).__getattribute__("_continuation")
+            if( super(dramatis.Actor.Name,future._actor).\
+                    __getattribute__("_actor") is not self._actor ):
+                # only this actor's own futures can be waited for
+                # without a thread
+                try:
+                    kind, value = "return", future.value
+                except Exception, exception:
+                    kind, value = "exception", exception
+                continue
+            if( future.resume( self ) ):
+                self._actor._gate.awaiting( future._id )
+                Scheduler.current.wait_notification( self._actor, future )
+                return
+            kind, value = future._type, future._value
 
 
@@ -9,6 +9,14 @@ def _matches( a, b ):
     # warning( "matches " + str(matched) + " " + str(a) + " : " + str(b) )
     return matched
 
+def _is_type( a ):
+    return isinstance(a,type)
+
+def _awaited( awaiting, tag ):
+    # an awaiting entry is a tag or, for a wait on several, a set
+    return awaiting == tag or \
+        type(awaiting) in ( frozenset, set ) and tag in awaiting
+
 class Gate(object):
 
     def __new__(cls):
@@ -20,10 +28,63 @@ class Gate(object):
         return gate
 
     class Case(object):
+        __slots__ = ( "_always", "_list", "_index", "_always_index",
+                      "_version", "_awaiting", "_tags" )
 
         def __init__(self):
             self._always=[]
             self._list=[]
+            # (dest, method) -> True/False when the decision does
+            # not depend on the task arguments, otherwise a tuple of
+            # ( argument patterns, result ) rules to try in order
+            self._index={}
+            # the same for the always list alone; None where no
+            # always rule can match
+            self._always_index={}
+            self._version=0
+            # tags of the rpc continuations the actor is blocked on,
+            # innermost last; see awaiting
+            self._awaiting=[]
+            # tag -> number of tagged entries in the list
+            self._tags={}
+
+        def _invalidate( self, vector ):
+            """Drops the index entries that vector could match."""
+            self._version += 1
+            for index in ( self._index, self._always_index ):
+                if( vector and not _is_type( vector[0] ) and
+                    ( len(vector) == 1 or not _is_type( vector[1] ) ) ):
+                    if len(vector) == 1:
+                        for key in index.keys():
+                            if key[0] == vector[0]:
+                                index.pop( key, None )
+                    else:
+                        index.pop( ( vector[0], vector[1] ), None )
+                else:
+                    index.clear()
+
+        def _compile( self, key, entries, miss ):
+            rules = []
+            for entry in entries:
+                vector, result, tag = entry
+                matches = True
+                for i in xrange(min(len(vector),2)):
+                    if( i >= len(key) or not _matches( vector[i], key[i] ) ):
+                        matches = False
+                        break
+                if( not matches ):
+                    continue
+                if( len(vector) <= 2 ):
+                    if( not rules ):
+                        return result
+                    rules.append( ( (), result ) )
+                    break
+                rules.append( ( tuple( [ ( v, _is_type( v ) )
+                                         for v in vector[2:] ] ),
+                                result ) )
+            if( not rules ):
+                return miss
+            return tuple(rules)
 
         def accept( self, *args ):
             return self.change( args, True, False )
@@ -55,6 +116,7 @@ class Gate(object):
                     break
             if( prepend ):
                 self._list.insert( 0, [ args, value, None ] )
+            self._invalidate( args )
 
             # warning( "changed: " + str(self._list) )
             
@@ -88,34 +150,144 @@ class Gate(object):
                         
             tbd.reverse()
             for index in tbd:
+                self._invalidate( list[index][0] )
+                if list is self._list and list[index][2]:
+                    self._tag( list[index][2], -1 )
                 list[index:index+1] = []
             if( prepend and value != None ):
                 list.insert( 0, [ args, value, tag ] )
+                if list is self._list and tag:
+                    self._tag( tag, 1 )
+            if( args and ( tbd or value != None ) ):
+                self._invalidate( args )
 
-        def accepts( self, *args ):
-            # warning( "accepts?? " + str(args) )
-            if len(args) >= 3 and args[1] == "__getattribute__":
-                args = args[0:1] + args[2:]
-            accepted = False
-            l = self._always + self._list
-            for entry in l:
-                vector, result, tag = entry
+        def _tag( self, tag, delta ):
+            count = self._tags.get( tag, 0 ) + delta
+            if count:
+                self._tags[tag] = count
+            else:
+                del self._tags[tag]
+
+        def _rules( self, index, entries, key, miss ):
+            if key[0] == "continuation":
+                # the method of a continuation task names its
+                # continuation, new with every call; indexing them
+                # would grow the index without bound
+                return self._compile( key, entries, miss )
+            rules = index.get( key )
+            if rules is None:
+                version = self._version
+                rules = index[key] = self._compile( key, entries, miss )
+                if rules is None:
+                    del index[key]
+                elif version != self._version:
+                    # raced with a gate change; don't keep a stale entry
+                    index.pop( key, None )
+            return rules
+
+        def _apply( self, rules, arguments, miss ):
+            for patterns, result in rules:
+                if len(patterns) > len(arguments):
+                    continue
                 matches = True
-                for i in xrange(len(vector)):
-                    v = vector[i]
-                    if( not _matches( v, args[i] ) ):
+                for i in xrange(len(patterns)):
+                    v, is_type = patterns[i]
+                    a = arguments[i]
+                    if( not ( v == a or is_type and isinstance(a,v) ) ):
                         matches = False
                         break
                 if( matches ):
-                    # warning( "does match " + str(entry) + " : " + str(args) )
-                    accepted = result
-                    break
-                # warning( "does not match " + str(entry) + " : " + str(args) )
-            # warning( "accepts? " + str(accepted) + " " + str(args) )
-            return accepted
+                    # warning( "does match " + str(patterns) + " : " + str(arguments) )
+                    return result
+            return miss
+
+        def decision( self, dest, method ):
+            """Returns True or False if every task for dest and method
+            is accepted or refused, None if it depends on the task
+            arguments."""
+            if method == "__getattribute__":
+                return None
+            key = ( dest, method )
+            if self._awaiting:
+                rules = self._always and \
+                    self._rules( self._always_index, self._always, key, None )
+                if rules is True or rules is False:
+                    return rules
+                if rules:
+                    return None
+                if dest == "object":
+                    return False
+                if dest == "continuation":
+                    return _awaited( self._awaiting[-1], method ) or None
+            rules = self._rules( self._index, self._always + self._list,
+                                 key, False )
+            if rules is True or rules is False:
+                return rules
+            return None
+
+        def accepts( self, *args ):
+            # warning( "accepts?? " + str(args) )
+            if len(args) >= 3 and args[1] == "__getattribute__":
+                args = args[0:1] + args[2:]
+            key = args[0:2]
+            if self._awaiting:
+                result = None
+                if self._always:
+                    result = self._rules( self._always_index, self._always,
+                                          key, None )
+                    if result is not None and \
+                            result is not True and result is not False:
+                        result = self._apply( result, args[2:], None )
+                if result is None:
+                    result = self._awaits( args )
+                if result is not None:
+                    return result
+            rules = self._rules( self._index, self._always + self._list,
+                                 key, False )
+            if rules is True or rules is False:
+                return rules
+            return self._apply( rules, args[2:], False )
+
+        def _awaits( self, args ):
+            # the rules only() would install for the innermost
+            # awaited continuation
+            dest = args[0]
+            if dest == "object":
+                return False
+            if dest == "continuation":
+                return ( len(args) > 1 and
+                         _awaited( self._awaiting[-1], args[1] ) or
+                         len(args) > 2 and args[2] == "exception" )
+            return None
+
+        def awaiting( self, tag, *tags ):
+            """Admits only the continuation named tag (and continuation
+            exceptions) until default_by_tag( tag ) is called.
+
+            Equivalent to only( [ "continuation", tag ], { "tag": tag } )
+            but does not touch the gate list: always rules still take
+            precedence and the decision is made without a list pass.
+
+            Given more tags, admits the continuations named by any of
+            them, until default_by_tag is called with any one. tag may
+            also be a set of tags, which the caller can add to while
+            it is awaited."""
+            if tags:
+                tag = frozenset( ( tag, ) + tags )
+            self._awaiting.append( tag )
+
+        def is_awaiting(self):
+            """Returns whether the gate only admits awaited
+            continuations."""
+            return bool( self._awaiting )
 
         def default_by_tag(self, tag):
-            self._change( self._list, None, None, { "tag": tag } )
+            for i in xrange( len(self._awaiting) - 1, -1, -1 ):
+                if _awaited( self._awaiting[i], tag ):
+                    del self._awaiting[i]
+                    break
+            if tag in self._tags:
+                self._change( self._list, None, None, { "tag": tag } )
 
         def only( self, args, options = {} ):
             self._change( self._list, [ "object" ], False, options )
@@ -0,0 +1,62 @@
+from __future__ import absolute_import
+from __future__ import with_statement
+
+from logging import warning
+
+from threading import Lock
+
+from dramatis.runtime.scheduler import Scheduler
+from dramatis.runtime.scheduler import _local
+
+class LoopScheduler(Scheduler):
+    """A scheduler that runs actors one task at a time, as on a single
+    event loop.
+
+    Select it before the runtime starts with
+
+      dramatis.runtime.Scheduler.engine = dramatis.runtime.LoopScheduler
+
+    A worker holds the loop while it delivers a task, so tasks never
+    run at the same time. A task that makes a blocking call (an rpc or
+    a future value) parks its thread and hands the loop on, as the
+    threaded scheduler parks the thread and starts another worker; once
+    the value arrives, the thread takes the loop back when the task
+    running on it is done. Blocking calls therefore behave as they do
+    on the threaded engine, each holding a parked thread while it
+    waits. Coroutine actor methods (see dramatis.coroutine) wait
+    without holding a thread at all, so actors that spend their time
+    waiting should be written as coroutines.
+
+    A task that blocks in anything else, e.g., time.sleep or a read,
+    holds the loop, and every other actor waits for it."""
+
+    def __init__(self):
+        super(LoopScheduler,self).__init__()
+        self.concurrency = 1
+        self._loop = Lock()
+
+    def deliver( self, task ):
+        self._loop.acquire()
+        _local.dramatis_looping = True
+        try:
+            super(LoopScheduler,self).deliver( task )
+        finally:
+            _local.dramatis_looping = False
+            self._loop.release()
+
+    def suspend( self, continuation ):
+        if not _local.dramatis_looping:
+            # e.g., main, which never holds the loop
+            return super(LoopScheduler,self).suspend( continuation )
+        _local.dramatis_looping = False
+        self._loop.release()
+        try:
+            super(LoopScheduler,self).suspend( continuation )
+        finally:
+            # whoever holds the loop may need the continuation
+            continuation._mutex.release()
+            try:
+                self._loop.acquire()
+            finally:
+                continuation._mutex.acquire()
+            _local.dramatis_looping = True
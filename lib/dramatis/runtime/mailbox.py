@@ -0,0 +1,128 @@
+from __future__ import absolute_import
+
+from logging import warning
+
+from collections import deque
+
+class Mailbox(object):
+    """The queue of tasks waiting to be run by an actor.
+
+    Tasks are partitioned by ( dest, method ). Picking the next task
+    asks the gate once per partition rather than once per queued task,
+    so tasks sitting in a refused partition are not looked at again
+    until the gate lets them through.
+
+    Among the tasks the gate accepts, the scheduling policy (see
+    dramatis.runtime.policy) picks: by the policy's rank, if it has
+    one, e.g., priority or deadline; in turns between senders, if it
+    orders tasks by_sender; or else the earliest arrival, which is the
+    order a single FIFO scan would produce. Ties go to the earliest
+    arrival."""
+
+    __slots__ = ( "_partitions", "_sequence", "_length", "_rank",
+                  "_by_sender", "_finish", "_virtual" )
+
+    def __init__( self, policy = None ):
+        self._partitions = {}
+        self._sequence = 0
+        self._length = 0
+        self._rank = getattr( policy, "rank", None )
+        self._by_sender = getattr( policy, "by_sender", False )
+        # for by_sender, the turn of the last task queued by each
+        # sender and the turn of the last task taken: a sender's task
+        # waits for the senders that have had fewer turns
+        self._finish = {}
+        self._virtual = 0
+
+    def __len__(self):
+        return self._length
+
+    def append( self, task ):
+        key = ( task.dest, task.method )
+        tasks = self._partitions.get( key )
+        if tasks is None:
+            tasks = self._partitions[key] = deque()
+        self._sequence += 1
+        if self._rank:
+            order = ( self._rank( task ), self._sequence )
+        elif self._by_sender:
+            turn = max( self._virtual,
+                        self._finish.get( task.sender, 0 ) ) + 1
+            self._finish[ task.sender ] = turn
+            order = ( turn, self._sequence )
+        else:
+            order = self._sequence
+        tasks.append( ( order, task ) )
+        self._length += 1
+
+    def take( self, gate, call_thread = None ):
+        """Removes and returns the first task, in the policy's order,
+        that the gate accepts or that belongs to call_thread; None if
+        there is none."""
+
+        # partitions are in arrival order; otherwise every accepted
+        # task in one has to be looked at
+        ordered = self._rank or self._by_sender
+        best = None
+        best_tasks = None
+        for key, tasks in self._partitions.iteritems():
+            decision = gate.decision( *key )
+            entry = None
+            if decision is True and not ordered:
+                entry = tasks[0]
+            elif decision is True or decision is None or call_thread:
+                for candidate in tasks:
+                    task = candidate[1]
+                    if( decision is True or
+                        ( call_thread and task.call_thread == call_thread ) or
+                        decision is None and
+                        gate.accepts( *( key + task.arguments ) ) ):
+                        if entry is None or candidate[0] < entry[0]:
+                            entry = candidate
+                        if not ordered:
+                            break
+            if entry and ( best is None or entry[0] < best[0] ):
+                best = entry
+                best_tasks = tasks
+        if best is None:
+            return None
+        if best_tasks[0] is best:
+            best_tasks.popleft()
+        else:
+            best_tasks.remove( best )
+        task = best[1]
+        if not best_tasks:
+            del self._partitions[ ( task.dest, task.method ) ]
+        self._length -= 1
+        if self._by_sender:
+            self._virtual = max( self._virtual, best[0][0] )
+            if self._finish.get( task.sender, 0 ) <= self._virtual:
+                # none of the sender's tasks left, as far as turns go
+                self._finish.pop( task.sender, None )
+        return task
+
+    def remove( self, task ):
+        """Removes task if it is queued; returns whether it was."""
+
+        key = ( task.dest, task.method )
+        tasks = self._partitions.get( key, () )
+        for entry in tasks:
+            if entry[1] is task:
+                tasks.remove( entry )
+                if not tasks:
+                    del self._partitions[key]
+                self._length -= 1
+                return True
+        return False
+
+    def drain(self):
+        """Removes and returns all queued tasks in the policy's order."""
+
+        entries = []
+        for tasks in self._partitions.itervalues():
+            entries.extend( tasks )
+        entries.sort( key = lambda entry: entry[0] )
+        self._partitions.clear()
+        self._finish.clear()
+        self._length = 0
+        return [ entry[1] for entry in entries ]
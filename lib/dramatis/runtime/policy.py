@@ -0,0 +1,122 @@
+from __future__ import absolute_import
+from __future__ import with_statement
+
+from logging import warning
+
+from threading import Lock
+from heapq import heappush
+from heapq import heappop
+from collections import deque
+
+class FIFO(deque):
+    """Runs tasks in the order they are scheduled.
+
+    The default policy. Each worker keeps a queue of its own and
+    steals from its peers when it runs dry, so the order is per
+    worker rather than global.
+
+    The scheduler's queue holds at most one task per actor, its next;
+    the tasks waiting behind it in the actor's mailbox are ordered by
+    the policy too (see dramatis.runtime.Mailbox). Under FIFO, they
+    run in the order they arrived."""
+
+    shared = False
+
+class Priority(object):
+    """Runs the task with the highest priority first.
+
+    A task's priority is the priority option of the name it was sent
+    through (see dramatis.priority), or else the priority of the actor
+    it was sent to (see dramatis.Actor.Interface.set_priority), or 0.
+    Among tasks of equal priority, continuations (the replies to rpcs
+    and futures) go first and the rest run in the order scheduled.
+
+    Like the other policies but FIFO, it keeps one queue for all
+    workers so the order holds across the whole scheduler. An actor
+    takes the tasks in its mailbox in the same order."""
+
+    shared = True
+
+    def __init__( self ):
+        self._heap = []
+        self._sequence = 0
+        self._mutex = Lock()
+
+    def __len__( self ):
+        return len(self._heap)
+
+    def append( self, task ):
+        with self._mutex:
+            self._sequence += 1
+            heappush( self._heap, ( self.rank( task ), self._sequence, task ) )
+
+    def popleft( self ):
+        with self._mutex:
+            return heappop( self._heap )[2]
+
+    @staticmethod
+    def rank( task ):
+        """The sort key of task; lower keys run first."""
+        return ( -getattr( task, "priority", 0 ),
+                 getattr( task, "dest", None ) != "continuation" )
+
+class EarliestDeadline(Priority):
+    """Runs the task with the earliest deadline first.
+
+    A task's deadline is set when it is sent, from the deadline option
+    of the name it was sent through (see dramatis.deadline) or else the
+    deadline of the actor it was sent to (see
+    dramatis.Actor.Interface.set_deadline), both in seconds. Tasks
+    without one run, in the order scheduled, after those with one."""
+
+    @staticmethod
+    def rank( task ):
+        deadline = getattr( task, "deadline", None )
+        if deadline is None:
+            return _never
+        return deadline
+
+_never = float( "inf" )
+
+class FairShare(object):
+    """Runs one task from each sending actor with tasks in turn.
+
+    An actor that sends many tasks, to one actor or to many, gets no
+    more turns than one that has sent a single task. Tasks not sent by
+    an actor, e.g., timer sends, take turns by the actor they run on.
+    Actors take the tasks in their mailboxes in the same way, so a
+    chatty sender doesn't hold up others sending to the same actor."""
+
+    shared = True
+    by_sender = True
+
+    def __init__( self ):
+        self._senders = {}
+        self._turns = deque()
+        self._length = 0
+        self._mutex = Lock()
+
+    def __len__( self ):
+        return self._length
+
+    def append( self, task ):
+        sender = getattr( task, "sender", None ) or task.actor
+        with self._mutex:
+            tasks = self._senders.get( sender )
+            if tasks is None:
+                tasks = self._senders[sender] = deque()
+                self._turns.append( sender )
+            tasks.append( task )
+            self._length += 1
+
+    def popleft( self ):
+        with self._mutex:
+            sender = self._turns.popleft()
+            tasks = self._senders[sender]
+            task = tasks.popleft()
+            if tasks:
+                self._turns.append( sender )
+            else:
+                del self._senders[sender]
+            self._length -= 1
+            return task
@@ -41,6 +41,9 @@ class Runtime:
 
     def __init__(self):
         self.warnings = True
+        # maximum number of tasks an actor runs back to back on one
+        # worker before yielding it; see Actor.Interface.set_throughput
+        self.throughput = 1
         self._mutex = Lock()
         self._exceptions = []
 
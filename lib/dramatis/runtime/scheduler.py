@@ -6,31 +6,61 @@ from logging import warning
 import threading
 from threading import Lock
 from threading import Condition
-from threading import Thread
 from traceback import print_exc
 
+from collections import deque
+
 import dramatis.runtime.actor
 
 from dramatis.runtime.thread_pool import ThreadPool
+from dramatis.runtime.policy import FIFO
+from dramatis.runtime.timers import Timers
+from dramatis.runtime.wait_graph import WaitGraph
+from dramatis.runtime.wait_graph import breakers
 
 _checkio = False
 
-_local = threading.local()
-_local.dramatis_actor = None
+class _Local(threading.local):
+    dramatis_actor = None
+    dramatis_worker = None
+    # the continuation of the call the thread is delivering
+    dramatis_delivering = None
+    # whether the thread holds the loop; see LoopScheduler
+    dramatis_looping = False
+
+_local = _Local()
+
+class _Worker(object):
+    """A scheduler worker.
+
+    Each worker owns a deque of tasks. Tasks scheduled from a worker
+    thread are pushed onto that worker's deque; tasks scheduled from
+    other threads (e.g., main) go to the scheduler inbox. A worker
+    drains its own deque first, then the inbox, and then steals from
+    its peers. A worker with nothing to do parks on its own condition
+    until it is kicked."""
+
+    def __init__(self,scheduler):
+        self._tasks = deque()
+        self._wait = Condition(scheduler._mutex)
+        self._idle = False
+        self._exiting = False
+        self._quantum = 0
+        self._next = None
 
 class Scheduler(object):
 
     class __metaclass__(type):
         @property
         def current(self):
-            if not hasattr(self,"_current"):
-                self._current = self()
-            return self._current
+            if not hasattr(Scheduler,"_current"):
+                Scheduler._current = Scheduler.engine()
+            return Scheduler._current
 
         def reset(self):
-            if hasattr(self,"_current"):
-                self._current._reset()
-                del self._current
+            if hasattr(Scheduler,"_current"):
+                Scheduler._current._reset()
+                del Scheduler._current
 
         @property
         def actor(self):
@@ -50,27 +80,33 @@ class Scheduler(object):
             return actor
 
     def _reset(self):
+        self.timers.stop()
+        self._retire()
         for pool in self._thread_pools:
             pool.reset()
 
     def __init__(self):
         self._thread_pool = ThreadPool()
-        self._thread_pools = [ self._thread_pool ]
+        self.timers = Timers( self )
+        self._thread_pools = [ self._thread_pool, self.timers.pool ]
         self._mutex = Lock()
-        self._wait = Condition(self._mutex)
         self._running_threads = 0
         self._suspended_continuations = {}
-        self._queue = []
+        self._policy = Scheduler.policy
+        self._inbox = self._policy()
+        self._workers = []
+        self._idle = []
         self._state = "idle"
+        self._deadlocked = False
 
-        self._main_mutex = Lock()
-        self._main_wait = Condition(self._main_mutex)
-        self._main_state = "running"
+        self._main_wait = Condition(self._mutex)
         self._quiescing = False
 
-        self._thread = None
-
         self._actors = []
+        self._waits = WaitGraph()
+
+        # number of unsuspended workers the scheduler will keep busy
+        self.concurrency = 4
 
     def append(self,actor):
         self._actors.append( actor )
@@ -83,149 +119,238 @@ class Scheduler(object):
                 sum += pool.size
         return sum
 
-    def schedule( self, task ):
-        # warning('schedule ' + str(self._state) )
-        with self._mutex:
-            self._queue.append( task )
-            if( len(self._queue) == 1 ):
-                if( self._state == "waiting" ):
-                    self._wait.notify()
-                elif( self._state == "idle" ):
+    @property
+    def _busy(self):
+        return len(self._workers) - len(self._idle)
+
+    def schedule( self, task, drain = False ):
+        worker = _local.dramatis_worker
+        if drain and worker and worker._quantum > 0:
+            # run-to-drain: the worker delivering this actor's last
+            # task runs the next one itself
+            worker._quantum -= 1
+            worker._next = task
+            return
+        if worker and not self._policy.shared:
+            worker._tasks.append( task )
+        else:
+            self._inbox.append( task )
+        # Unlocked hints; a worker that is about to park rescans the
+        # deques after registering itself as idle, so a push that
+        # misses an idle worker here is still picked up.
+        if( self._idle or self._state == "idle" or
+            self._busy < self.concurrency ):
+            with self._mutex:
+                if( self._state == "idle" ):
                     self._state = "running"
                     self._running_threads = 1
                     _checkio and warning( str(threading.currentThread()) + " checkout main; running will be " + str(self._running_threads) )
-                    try:
-                        t = Thread( target = self._run )
-                        t.setDaemon(True)
-                        t.start()
-                    except Exception, e:
-                        warning( "got an ex 0 " + repr(e) )
-                        raise e
+                self._kick()
 
-    class _Done(Exception):pass
+    # must be called with self._mutex held
+    def _kick(self):
+        if self._idle:
+            worker = self._idle.pop()
+            worker._idle = False
+            self._running_threads += 1
+            worker._wait.notify()
+        elif( self._busy < self.concurrency or self._running_threads == 0 ):
+            worker = _Worker( self )
+            self._workers.append( worker )
+            self._running_threads += 1
+            try:
+                self._thread_pool( target = self._run, args = ( worker, ) )
+            except Exception, e:
+                warning( "got an ex 0 " + repr(e) )
+                raise e
+
+    # must be called with self._mutex held
+    def _pending(self):
+        if self._inbox:
+            return True
+        for worker in self._workers:
+            if worker._tasks:
+                return True
+        return False
+
+    def _take( self, worker ):
+        for tasks in ( worker._tasks, self._inbox ):
+            try:
+                return tasks.popleft()
+            except IndexError: pass
+        for victim in list(self._workers):
+            if victim is not worker:
+                try:
+                    return victim._tasks.popleft()
+                except IndexError: pass
+        return None
 
-    def _run(self):
-        _checkio and warning( str(threading.currentThread()) + " scheduler starting " + str(self._state) )
+    def _run( self, worker ):
+        _checkio and warning( str(threading.currentThread()) + " worker starting" )
+        _local.dramatis_worker = worker
         try:
             while True:
-                with self._mutex:
-                    while len(self._queue) == 0 and self._running_threads != 0:
-                        self._state = "waiting"
-                        try:
-                            # warning( "schd sleeping " + str(threading.currentThread()) + " " + repr(self._wait))
-                            self._wait.wait()
-                            # warning( "schd awake " + str(threading.currentThread())  )
-                        except Exception, exception:
-                            # warning( "wait exception: #{exception}" )
-                            pass
-                        finally:
-                            # warning( "schd running " + str(threading.currentThread())  )
-                            self._state = "running"
-                        
                 try:
-                    with self._mutex:
-                        self._maybe_deadlock()
+                    task = self._take( worker ) or self._park( worker )
                 except dramatis.Deadlock, deadlock:
-                    actors = None
-                    with self._mutex:
-                        actors = list(self._actors)
-                    for actor in actors:
-                        _local.dramatis_actor = actor.name
-                        actor.deadlock( deadlock )
-                    _local.dramatis_actor = None
-
-                with self._mutex:
-                    self._maybe_deadlock()
-    
-                with self._mutex:
-                
-                    if( len(self._queue) == 0 and self._running_threads == 0 ):
-                        raise Scheduler._Done()
-
-                    if( len(self._queue) > 0 ):
-                    
-                        task = self._queue.pop(0)
-            
-                        self._running_threads += 1
+                    self._deadlock( deadlock )
+                    continue
+                if task is None:
+                    break
+                self.deliver( task )
+        finally:
+            _local.dramatis_worker = None
+        _checkio and warning( str(threading.currentThread()) + " worker ending" )
 
+    def _park( self, worker ):
+        with self._mutex:
+            self._running_threads -= 1
+            worker._idle = True
+            self._idle.append( worker )
+            while True:
+                if( worker._exiting or
+                    ( worker._idle and self._running_threads > 0 and
+                      len(self._idle) > self.concurrency ) ):
+                    # surplus workers (e.g., spawned to cover
+                    # suspended ones) go back to the thread pool
+                    if worker._idle:
+                        worker._idle = False
+                        self._idle.remove( worker )
+                    self._workers.remove( worker )
+                    return None
+                task = self._take( worker )
+                if task:
+                    self._unpark( worker )
+                    return task
+                if not worker._idle:
+                    # kicked, but the work was taken by someone else
+                    self._running_threads -= 1
+                    worker._idle = True
+                    self._idle.append( worker )
+                if self._running_threads == 0:
+                    if not self._deadlocked:
                         try:
-                            self._thread_pool( target = self._deliver_thread,
-                                                args = (task,) )
-                        except Exception, e:
-                            warning( "got an ex 1 " + repr(e) )
-                            print_exc()
-                            raise e
-
-        except Scheduler._Done: pass
-        except Exception, exception:
-            warning( "1 *? exception " + str(exception) )
-            dramatis.Runtime.current.exception( exception )
+                            self._maybe_deadlock()
+                        except dramatis.Deadlock:
+                            self._deadlocked = True
+                            self._unpark( worker )
+                            raise
+                    self._state = "idle"
+                    self._main_wait.notify()
+                worker._wait.wait()
 
-        _checkio and warning( "scheduler giving up the ghost #{self._queue.length} #{Thread.current}" )
+    # must be called with self._mutex held
+    def _unpark( self, worker ):
+        if worker._idle:
+            worker._idle = False
+            self._idle.remove( worker )
+            self._running_threads += 1
 
+    def _retire(self):
+        with self._mutex:
+            for worker in self._idle:
+                worker._idle = False
+                worker._exiting = True
+                worker._wait.notify()
+            self._idle[:] = []
+
+    def _deadlock( self, deadlock ):
+        actors = None
+        with self._mutex:
+            actors = list(self._actors)
         try:
-            with self._mutex:
-                self._maybe_deadlock()
-        except dramatis.Deadlock, deadlock:
-            actors = []
-            with self._mutex:
-                actors = list(self._actors)
-            for actor in actors:
-                actor.deadlock( deadlock )
+            # empty every mailbox before failing any task: failing a
+            # task can unblock its actor on another worker, which
+            # must not then run tasks that were part of the deadlock
+            drained = [ ( actor, actor.drain() ) for actor in actors ]
+            for actor, tasks in drained:
+                _local.dramatis_actor = actor.name
+                actor.deadlock( deadlock, tasks )
         except Exception, exception:
             warning( "2 exception " + str(exception) )
             print_exc()
             dramatis.Runtime.current.exception( exception )
-    
-        _checkio and warning( "scheduler giving up after final deadlock check #{self._queue.length} #{Thread.current}" )
-
-        with self._main_mutex:
-            state = self._main_state
-            self._main_state = "may_finish"
-            if( state == "waiting" ):
-                self._main_join = threading.currentThread()
-                try:
-                    self._main_wait.notify()
-                except Exception, e:
-                    warning( "hell!!")
-                    raise e
-
-        if len(self._queue) > 0:
-            raise "hell"
-        self._state = "idle"
-        self._thread = None
-
-        _checkio and warning( "#{Thread.current} scheduler ending" )
+        _local.dramatis_actor = None
 
     def _maybe_deadlock(self):
-        # warning ( "maybe_deadlock " + str(threading.currentThread()) + " threads " + str(self._running_threads) + " q " + str(len(self._queue )) + " c " + str(len(self._suspended_continuations)) + " qi " + str(self._quiescing) )
-        if( self._running_threads == 0 and len(self._queue) == 0 and
+        # warning ( "maybe_deadlock " + str(threading.currentThread()) + " threads " + str(self._running_threads) + " c " + str(len(self._suspended_continuations)) + " qi " + str(self._quiescing) )
+        if( self._running_threads == 0 and not self._pending() and
             len(self._suspended_continuations) > 0 and not self._quiescing ):
             # warning ( "DEADLOCK" )
             raise dramatis.Deadlock()
 
     def suspend_notification( self, continuation ):
+        worker = _local.dramatis_worker
         with self._mutex:
             if( self._state == "idle" ):
                 self._state = "running"
                 self._running_threads = 1
-                _checkio and warning( "#{Thread.current} checkout--1 #{Thread.main} #{self._running_threads}" )
-                try:
-                    t = Thread( target = self._run )
-                    t.setDaemon(True)
-                    t.start()
-                except Exception, e:
-                    warning( "got an ex 2 " + repr(e) )
-                    raise e
             _checkio and warning( str(threading.currentThread()) + " checkin-0; running will be " + str(self._running_threads-1) )
             self._running_threads -= 1
-            if( self._state == "waiting" ):
-                self._wait.notify()
-            self._suspended_continuations[str(continuation)] = continuation
+            if worker:
+                # a suspended worker hands its backlog to the inbox
+                # and drops out of the steal rotation until it wakes
+                self._workers.remove( worker )
+                while worker._tasks:
+                    try:
+                        self._inbox.append( worker._tasks.popleft() )
+                    except IndexError: pass
+            self._deadlocked = False
+            self._suspended_continuations[continuation._id] = \
+                ( continuation, worker )
+            if( self._running_threads == 0 or self._pending() ):
+                self._kick()
+
+    def checkout( self ):
+        """Counts something outside the workers that will schedule
+        tasks later, e.g., a pending timer, as a running thread, so
+        the runtime doesn't go idle (or deadlock) waiting for it."""
+        with self._mutex:
+            if( self._state == "idle" ):
+                self._state = "running"
+                self._running_threads = 1
+            self._running_threads += 1
+
+    def checkin( self ):
+        """Undoes checkout."""
+        with self._mutex:
+            self._running_threads -= 1
+            if self._running_threads == 0:
+                self._kick()
+
+    def wait_notification( self, actor, continuation ):
+        """Records that actor waits for continuation's call. If that
+        closes a deadlocked cycle, the calls in the cycle fail with
+        dramatis.Deadlock; actors outside it are left alone."""
+        cycle = self._waits.wait( actor, continuation )
+        if cycle:
+            for task in breakers( cycle, dramatis.Deadlock() ):
+                self.schedule( task )
+
+    def unwait_notification( self, continuation ):
+        """Records that the actor waiting for continuation's call no
+        longer is, e.g., a group that had enough futures without it."""
+        self._waits.unwait( continuation )
+
+    def answer_notification( self, continuation ):
+        """Records the answer to continuation's call. Returns False
+        if it already had one, e.g., a timeout."""
+        return self._waits.answer( continuation )
+
+    def suspend( self, continuation ):
+        """Blocks the current thread until continuation is signaled.
+
+        Called with the continuation's mutex held."""
+        self.suspend_notification( continuation )
+        continuation._wait.wait()
 
     def wakeup_notification( self, continuation):
         with self._mutex:
-            del self._suspended_continuations[ str(continuation) ]
+            c, worker = self._suspended_continuations.pop( continuation._id )
+            if worker:
+                self._workers.append( worker )
+            if( self._state == "idle" ):
+                self._state = "running"
             self._running_threads += 1
             _checkio and warning( str(threading.currentThread()) + " checkout " + str(self._running_threads) )
 
@@ -237,62 +362,36 @@ class Scheduler(object):
         # warning("main at exit " + str(quiescing) + " " + str(threading.currentThread()) )
         with self._mutex:
             self._quiescing = quiescing
-            _checkio and warning( str(threading.currentThread()) + " main maybe checkin-1 " + str(self._running_threads) + " " +str(self._state) +" "+ str(self._main_state) +" " +str(quiescing) )
-            if self._state != "idle":
-                self._running_threads -= 1
-                if self._state == "waiting":
-                    try:
-                        # warning( "notifying " + repr(self._wait) )
-                        # warning( str(threading.enumerate()) )
-                        self._wait.notify()
-                        # warning( str(threading.enumerate()) )
-                        # warning( "notified" + repr(self._wait)  )
-                    except Exception, e:
-                        warning( "crap " + str(e) )
-                        raise e;
-
-            _checkio and warning( str(threading.currentThread() ) + " main signaled " + str(self._running_threads) + " " + str(self._state) + " " + str(self._main_state) + " " + str(quiescing) )
-
-        with self._main_mutex:
-            if self._main_state == "running":
-                with self._mutex:
-                    if self._state != "idle":
-                        self._main_state = "waiting"
-                if self._main_state == "waiting":
-                    # warning( "main waiting " + str(threading.currentThread()) )
-                    self._main_wait.wait()
-                    # warning( "main finished waiting " + str(threading.currentThread()) )
-                    self._main_join.join()
-                    self._main_join = None
-            else:
-                self._maybe_deadlock()
-                self._main_state = "may_finish"
-
-            if self._quiescing:
-                self._main_state = "running"
-            self._quiescing = False
+            try:
+                _checkio and warning( str(threading.currentThread()) + " main maybe checkin-1 " + str(self._running_threads) + " " +str(self._state) + " " + str(quiescing) )
+                if self._state != "idle":
+                    self._running_threads -= 1
+                    if self._running_threads == 0:
+                        self._kick()
+                    while self._state != "idle":
+                        self._main_wait.wait()
+                else:
+                    self._maybe_deadlock()
+            finally:
+                self._quiescing = False
 
+        self._retire()
         self._thread_pool.reset( quiescing )
 
         dramatis.Runtime.current._maybe_raise_exceptions( quiescing )
 
-    def _deliver_thread(self,*args):
-        _checkio and warning( str(threading.currentThread()) + " spining up; running will be " + str(self._running_threads) )
-        try:
-            self.deliver( args[0] )
-        except Exception, e:
-            warning( "unexptected deliver error " + repr(e) )
-            raise e
-        finally:
-            with self._mutex:
-                self._running_threads -= 1
-                _checkio and warning( str(threading.currentThread()) + " checkin-2 / retiring; now running " + str(self._running_threads) + " " + str(self._state) )
-                # warning( threading.enumerate() )
-                if( self._state == "waiting" ):
-                    self._wait.notify()
-
-    def deliver( self, task ):
+    @property
+    def inlinable(self):
+        return _local.dramatis_worker is not None
+
+    def deliver_inline( self, task ):
+        """Delivers task on the current worker, which is in the middle
+        of delivering a task for another actor."""
+        worker = _local.dramatis_worker
+        actor = _local.dramatis_actor
+        quantum = worker._quantum
         _local.dramatis_actor = task.actor.name
+        worker._quantum = 0
         try:
             task.deliver()
         except Exception, exception:
@@ -300,4 +399,37 @@ class Scheduler(object):
             print_exc()
             dramatis.Runtime.current.exception( exception )
         finally:
+            worker._quantum = quantum
+            _local.dramatis_actor = actor
+
+    def deliver( self, task ):
+        self._deadlocked = False
+        worker = _local.dramatis_worker
+        _local.dramatis_actor = task.actor.name
+        if worker:
+            worker._quantum = task.actor.throughput - 1
+        try:
+            while task:
+                try:
+                    task.deliver()
+                except Exception, exception:
+                    warning( "3 exception " + str(exception) )
+                    print_exc()
+                    dramatis.Runtime.current.exception( exception )
+                task = None
+                if worker and worker._next:
+                    task, worker._next = worker._next, None
+        finally:
+            if worker:
+                worker._quantum = 0
             _local.dramatis_actor = None
+
+# the scheduler class Scheduler.current instantiates; assign another
+# engine, e.g. dramatis.runtime.LoopScheduler, before the runtime
+# starts or after dramatis.Runtime.reset
+Scheduler.engine = Scheduler
+
+# the run queue class, which decides the order tasks run in; see
+# dramatis.runtime.policy. Like engine, it is read when the scheduler
+# is created.
+Scheduler.policy = FIFO
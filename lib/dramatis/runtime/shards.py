@@ -0,0 +1,285 @@
+from __future__ import absolute_import
+from __future__ import with_statement
+
+from logging import warning
+
+import os
+from threading import Lock
+from threading import Thread
+from weakref import WeakKeyDictionary
+from multiprocessing import Pipe
+from multiprocessing import Process
+
+import dramatis
+from dramatis.runtime.actor import Actor
+
+class Shards(object):
+    """Runs actors in a set of worker processes.
+
+    A dramatis runtime lives in one interpreter, so actors that are CPU
+    bound share one core however many threads the scheduler uses.
+    Shards starts processes worker processes, each with a runtime of
+    its own, and places actors in them, e.g.,
+
+      shards = dramatis.runtime.Shards( 4 )
+      fib = shards.spawn( Fib, 30 )
+      fib.value
+
+    spawn returns an ordinary actor name. Calls on it are forwarded, as
+    pickles over a pipe, to the actor in its shard, where they are
+    gated and run as usual; results (or exceptions) come back the same
+    way and go to the call's continuation. Classes, arguments and
+    results must therefore be picklable: classes must be importable
+    (or defined in __main__) and names cannot be passed. Each shard has
+    a reader thread that takes replies off its pipe and schedules them,
+    so outstanding calls hold no workers. spawn itself waits for the
+    actor to be created as it would in an rpc.
+
+    placement picks the shard for actors spawned without a shard hint:
+    "round-robin" (the default), "least-loaded" (the shard with the
+    fewest actors), or a function called with the shards, the class
+    and the arguments that returns a shard index."""
+
+    def __init__( self, processes, placement = "round-robin" ):
+        self._shards = [ _Shard() for i in xrange(processes) ]
+        self._placement = placement
+        self._next = 0
+        self._mutex = Lock()
+
+    def __len__( self ):
+        return len(self._shards)
+
+    def spawn( self, cls, *args, **options ):
+        """Creates an actor of class cls, with args, in a shard.
+
+        spawn( cls, *args ) -> an_actor_name
+        spawn( cls, *args, shard = index ) -> an_actor_name"""
+
+        index = options.get( "shard" )
+        if index is None:
+            index = self._place( cls, args )
+        shard = self._shards[ index % len(self._shards) ]
+        remote = _Remote( shard, _behavior_class( cls )() )
+        remote.create( cls, args )
+        return remote.name
+
+    def _place( self, cls, args ):
+        with self._mutex:
+            if callable( self._placement ):
+                return self._placement( self, cls, args )
+            elif self._placement == "least-loaded":
+                counts = [ shard.actors for shard in self._shards ]
+                return counts.index( min( counts ) )
+            elif self._placement == "round-robin":
+                index = self._next
+                self._next = ( index + 1 ) % len(self._shards)
+                return index
+            raise dramatis.error.Error( "unknown placement " +
+                                        repr( self._placement ) )
+
+    def stop( self ):
+        """Stops the worker processes. Actors in them are lost."""
+        for shard in self._shards:
+            shard.stop()
+
+class _Shard(object):
+
+    def __init__( self ):
+        self._connection, child = Pipe()
+        self._process = Process( target = _serve, args = ( child, ) )
+        self._process.daemon = True
+        self._process.start()
+        child.close()
+        self.actors = 0
+        self._send = Lock()
+        self._mutex = Lock()
+        self._calls = {}
+        self._sequence = 0
+        self._closed = False
+        self._reader = Thread( target = self._read )
+        self._reader.setDaemon( True )
+        self._reader.start()
+
+    def call( self, task, *request ):
+        """Sends request; the reply goes to task's continuation from
+        a _Reply scheduled by the reader."""
+        scheduler = dramatis.runtime.Scheduler.current
+        # the runtime mustn't go idle (or deadlock) while the reply
+        # is outstanding
+        scheduler.checkout()
+        with self._mutex:
+            if self._closed:
+                scheduler.checkin()
+                raise dramatis.error.Error( "shard has stopped" )
+            id = self._next( request )
+            self._calls[id] = ( task, scheduler )
+        with self._send:
+            self._connection.send( ( id, ) + request )
+
+    def stop( self ):
+        with self._send:
+            self._connection.send( ( None, "stop" ) )
+        self._process.join()
+        self._reader.join()
+        self._connection.close()
+
+    def _next( self, request ):
+        # must be called with self._mutex held
+        id = self._sequence
+        self._sequence += 1
+        if request[0] == "create":
+            self.actors += 1
+        return id
+
+    def _read( self ):
+        while True:
+            try:
+                reply = self._connection.recv()
+            except ( EOFError, IOError ):
+                break
+            with self._mutex:
+                task, scheduler = self._calls.pop( reply[0] )
+            scheduler.schedule( _Reply( task, *reply[1:] ) )
+            scheduler.checkin()
+        # the shard is gone; nothing else will be answered
+        with self._mutex:
+            self._closed = True
+            calls = self._calls.values()
+            self._calls.clear()
+        for task, scheduler in calls:
+            scheduler.schedule( _Reply( task, "exception",
+                                dramatis.error.Error( "shard has stopped" ) ) )
+            scheduler.checkin()
+
+def _forwarded( self, *args ): pass
+
+_behavior_classes = WeakKeyDictionary()
+
+def _behavior_class( cls ):
+    # a stand-in behavior with the methods and properties of cls so
+    # that names see the same interface; it is never called. It holds
+    # nothing of cls, so it goes when cls does.
+    result = _behavior_classes.get( cls )
+    if result is None:
+        result = _behavior_classes[cls] = _stand_in( cls )
+    return result
+
+def _stand_in( cls ):
+    attributes = {}
+    for klass in reversed( cls.__mro__ ):
+        if( klass is object or
+            klass.__module__.startswith( "dramatis." ) ):
+            continue
+        for attr, desc in klass.__dict__.items():
+            if attr.startswith( "__" ):
+                continue
+            if type(desc) == property:
+                attributes[attr] = property()
+            elif callable( desc ):
+                attributes[attr] = _forwarded
+    return type( "Remote" + cls.__name__, ( object, ), attributes )
+
+class _Remote( Actor ):
+    """The local side of an actor in a shard.
+
+    Tasks are not queued locally: each is sent to the shard, and the
+    shard's reader schedules a _Reply, like a task, that passes the
+    answer to the task's continuation."""
+
+    def __init__( self, shard, behavior ):
+        super(_Remote,self).__init__( behavior )
+        self._shard = shard
+        self._key = None
+
+    def create( self, cls, args ):
+        # answered like any call: the caller waits as in an rpc
+        task = dramatis.runtime.Task( self, "object", ( "__init__", ) + args,
+                                      { "continuation": "rpc" } )
+        self._shard.call( task, "create", cls, args )
+        self._key = task.queued()
+
+    def common_send( self, dest, args, opts ):
+        task = dramatis.runtime.Task( self, dest, args, opts )
+        if dest != "object":
+            raise dramatis.error.Error( "cannot send " + repr( args[0] ) +
+                                        " to an actor in a shard" )
+        if task.method == "__getattribute__":
+            self._shard.call( task, "get", self._key, task.arguments[0] )
+        else:
+            self._shard.call( task, "call", self._key, task.method,
+                              task.arguments )
+        return task.queued()
+
+class _Reply(object):
+
+    def __init__( self, task, kind, value ):
+        self.actor = task.actor
+        self._task = task
+        self._kind = kind
+        self._value = value
+
+    def deliver( self ):
+        if self._kind == "exception":
+            self._task._continuation.exception( self._value )
+        else:
+            self._task._continuation.result( self._value )
+
+class _Server(object):
+
+    # runs in the shard; requests from the pipe are queued here in
+    # order and answered by block continuations so that waiting for
+    # one actor does not hold up the others
+
+    def __init__( self, connection ):
+        self._connection = connection
+        self._actors = {}
+
+    def request( self, id, method, *args ):
+        try:
+            if method == "create":
+                cls, args = args
+                if issubclass( cls, dramatis.Actor ):
+                    name = cls( *args )
+                else:
+                    name = dramatis.Actor( cls( *args ) )
+                self._actors[id] = name
+                self._reply( id, "return", id )
+                return
+            key, attr = args[0:2]
+            name = dramatis.interface( self._actors[key] ).continuation(
+                { "result": lambda v: self._reply( id, "return", v ),
+                  "exception": lambda e: self._reply( id, "exception", e ) } )
+            if method == "get":
+                getattr( name, attr )
+            else:
+                getattr( name, attr )( *args[2] )
+        except Exception, exception:
+            self._reply( id, "exception", exception )
+
+    def _reply( self, id, kind, value ):
+        try:
+            self._connection.send( ( id, kind, value ) )
+        except Exception, exception:
+            # e.g., the value does not pickle
+            self._connection.send(
+                ( id, "exception", dramatis.error.Error( repr(exception) ) ) )
+
+def _serve( connection ):
+    # the runtime singletons were copied from the parent process along
+    # with locks its other threads may hold; start over
+    for cls in ( dramatis.runtime.Scheduler, dramatis.runtime.actor.Main,
+                 dramatis.Runtime ):
+        if "_current" in cls.__dict__:
+            delattr( cls, "_current" )
+    server = dramatis.Actor( _Server( connection ) )
+    while True:
+        request = connection.recv()
+        if request[1] == "stop":
+            break
+        dramatis.release( server ).request( *request )
+    try:
+        dramatis.Runtime.current.quiesce()
+    except Exception, exception:
+        warning( "shard exiting with " + repr(exception) )
+    connection.close()
+    os._exit( 0 )
@@ -2,15 +2,23 @@ from __future__ import with_statement
 
 from logging import warning
 from threading import Lock
+from time import time
 
 import dramatis
 import dramatis.runtime.continuation
 from dramatis.runtime import Scheduler
+from dramatis.runtime.scheduler import _local
+from dramatis.runtime import continuation
 
 def _func(): pass
 _func = type(_func)
 
+_continuations = ( continuation.Nil, continuation.RPC,
+                   continuation.Block, continuation.Future )
+
 class Task(object):
+    __slots__ = ( "_actor", "_dest", "_args", "_options", "_call_thread",
+                  "_continuation", "_deadline", "_borrowed", "_sender" )
 
     @property
     def dest(self):
@@ -30,21 +38,45 @@ class Task(object):
 
     actor = property( lambda(self): self._actor )
 
+    # the runtime actor that sent the task
+    sender = property( lambda(self): self._sender )
+
+    @property
+    def priority(self):
+        priority = self._options.get("priority")
+        if priority is None:
+            return self._actor.priority
+        return priority
+
+    @property
+    def deadline(self):
+        return self._deadline
+
     def __init__(self, actor, dest, args, options ):
         self._actor = actor
         self._dest = dest
         self._options = options
 
         self._call_thread = None
+        self._borrowed = False
 
-        name = Scheduler.actor
+        self._deadline = self._options.get("deadline", actor.deadline)
+        if self._deadline is not None:
+            self._deadline += time()
+
+        # the sender; a worker thread has it at hand
+        name = _local.dramatis_actor or Scheduler.actor
         actor = super(dramatis.Actor.Name,name).__getattribute__("_actor")
+        self._sender = actor
 
         behavior = actor.behavior
-        args = list(args)
-        for i in xrange(len(args)):
-            if( args[i] is behavior ):
-                args[i] = name
+        for arg in args:
+            if( arg is behavior ):
+                args = list(args)
+                for i in xrange(len(args)):
+                    if( args[i] is behavior ):
+                        args[i] = name
+                break
         self._args = tuple(args)
 
         if( actor.call_threading_enabled ):
@@ -54,33 +86,70 @@ class Task(object):
                 raise "hell"
             self._call_thread = actor._call_thread
             if( self._call_thread == None ):
-                self._call_thread = str(self)
+                self._call_thread = continuation.next_id()
 
         # warn "task #{self} #{_args[0]} call thread [ #{self._call_thread} ] #{options.to_a.join(' ')}"
 
         if ( self._options["continuation"] == "none" ):
-            self._continuation = dramatis.runtime.continuation.Nil( name, self._call_thread )
+            self._continuation = actor.nil
         elif( self._options["continuation"] == "rpc" ):
             self._continuation = \
               dramatis.runtime. \
                 continuation.RPC( name,
                                   self._call_thread,
-                                  self._options.get("nonblocking") )
+                                  self._options.get("nonblocking"),
+                                  self )
         elif( self._options["continuation"] == "future" ):
-            self._continuation = dramatis.runtime.continuation.Future( name, self._call_thread )
+            self._continuation = dramatis.runtime.continuation.Future( name, self._call_thread, self )
+        elif( self._options["continuation"] == "stream" ):
+            self._continuation = \
+                dramatis.runtime.continuation.Stream( name,
+                                                      self._call_thread,
+                                                      self,
+                                                      self._options["window"] )
+        elif( isinstance( self._options["continuation"], _continuations ) ):
+            # a pipelined or forwarded call answers a continuation made
+            # for another call, which the caller is already holding
+            self._continuation = self._options["continuation"]
+            self._borrowed = True
+            if hasattr( self._continuation, "_task" ):
+                self._continuation._task = self
         elif( isinstance( self._options["continuation"], _func) ):
             self._continuation = \
                 dramatis.runtime.continuation.Block( name,
                                                      self._call_thread,
                                                      options.get("continuation"),
-                                                     options.get("exception") )
+                                                     options.get("exception"),
+                                                     self )
         else:
             raise dramatis.error.Internal( "invalid contiunation type: ", type(self._options["continuation"]) )
 
+        timeout = self._options.get("timeout")
+        if( timeout is not None and
+            ( self._options["continuation"] in ( "rpc", "future" ) or
+              isinstance( self._options["continuation"], _func ) ) ):
+            self._continuation.expire( timeout )
+
     def exception(self, e):
         return self._continuation.exception( e )
 
+    def inline(self):
+        """Prepares the task to be delivered on the sending thread.
+
+        Only blocking rpcs sent from a worker thread can be, and not
+        those on a call thread: the caller has to stay able to take
+        calls back on that thread while it waits. Returns False for
+        anything else."""
+        if( not Scheduler.current.inlinable or self._borrowed or
+            self._call_thread is not None or
+            not isinstance( self._continuation,
+                            dramatis.runtime.continuation.RPC ) ):
+            return False
+        return self._continuation.inline()
+
     def queued(self):
+        if self._borrowed:
+            return None
         return self._continuation.queued()
 
     def deliver(self):
@@ -0,0 +1,189 @@
+from __future__ import absolute_import
+from __future__ import with_statement
+
+from logging import warning
+
+from time import time
+from math import ceil
+from threading import Lock
+from threading import Condition
+from traceback import print_exc
+
+import dramatis
+from dramatis.runtime.thread_pool import ThreadPool
+
+class Timers(object):
+    """The runtime's timer service.
+
+    Timers are kept in a hashed timing wheel: a ring of slots, one per
+    tick, with each timer in the slot of the tick it is due on (modulo
+    the ring's size). Adding or cancelling a timer is O(1); each tick
+    looks at one slot. A single thread turns the wheel, and only while
+    there are timers pending.
+
+    A pending one-shot timer counts as running work, so the runtime
+    does not go idle (or report a deadlock) while, e.g., an actor is
+    waiting for one. Interval timers don't, since they never finish;
+    cancel them before expecting quiesce to return."""
+
+    # seconds per tick and ticks per turn of the wheel
+    tick = 0.01
+    slots = 512
+
+    def __init__( self, scheduler ):
+        self._scheduler = scheduler
+        self.pool = ThreadPool()
+        self._mutex = Lock()
+        self._wait = Condition( self._mutex )
+        self._wheel = [ [] for i in xrange(self.slots) ]
+        self._start = time()
+        self._now = 0
+        self._pending = 0
+        self._held = 0
+        self._turning = False
+        self._stopped = False
+
+    def after( self, seconds, function, interval = None ):
+        """Calls function, on the timer thread, seconds from now and,
+        if interval is given, every interval seconds after that.
+        Returns a dramatis.runtime.timers.Timer that can cancel it.
+
+        function should return quickly; it holds up other timers."""
+
+        timer = Timer( self, function, interval and self._ticks( interval ) )
+        with self._mutex:
+            if self._stopped:
+                raise dramatis.error.Error( "timers stopped" )
+            now = time()
+            if not self._turning:
+                # the wheel stands still while empty; catch it up
+                self._now = self._tick( now )
+                self._turning = True
+                self.pool( target = self._turn )
+            self._add( timer, self._due( now + seconds ) )
+            self._pending += 1
+            if not timer._interval:
+                self._hold()
+        return timer
+
+    def stop( self ):
+        """Stops the wheel; pending timers never fire."""
+        with self._mutex:
+            self._stopped = True
+            self._wait.notify()
+
+    def _cancel( self, timer ):
+        with self._mutex:
+            if timer._state != "pending":
+                return False
+            timer._state = "cancelled"
+            self._pending -= 1
+            if not timer._interval:
+                self._unhold()
+            return True
+
+    def _ticks( self, seconds ):
+        return max( 1, int( ceil( seconds / self.tick ) ) )
+
+    def _tick( self, now ):
+        return int( ( now - self._start ) / self.tick )
+
+    def _due( self, then ):
+        # the first tick at or after then, and no earlier than the next
+        return max( self._now + 1,
+                    int( ceil( ( then - self._start ) / self.tick ) ) )
+
+    # the following must be called with self._mutex held
+
+    def _add( self, timer, due ):
+        timer._due = due
+        self._wheel[ due % self.slots ].append( timer )
+
+    def _hold( self ):
+        self._held += 1
+        if self._held == 1:
+            self._scheduler.checkout()
+
+    def _unhold( self ):
+        self._held -= 1
+        if self._held == 0:
+            self._scheduler.checkin()
+
+    def _turn( self ):
+        with self._mutex:
+            while self._pending and not self._stopped:
+                next = self._start + ( self._now + 1 ) * self.tick
+                delay = next - time()
+                if delay > 0:
+                    self._wait.wait( delay )
+                    continue
+                due = []
+                last = self._tick( time() )
+                while self._now < last:
+                    self._now += 1
+                    index = self._now % self.slots
+                    waiting = []
+                    for timer in self._wheel[index]:
+                        if timer._state != "pending":
+                            continue
+                        if timer._due <= self._now:
+                            due.append( timer )
+                        else:
+                            waiting.append( timer )
+                    self._wheel[index] = waiting
+                if not due:
+                    continue
+                for timer in due:
+                    if timer._interval:
+                        self._add( timer, self._now + timer._interval )
+                    else:
+                        timer._state = "fired"
+                self._mutex.release()
+                try:
+                    for timer in due:
+                        try:
+                            timer._function()
+                        except Exception, exception:
+                            print_exc()
+                            dramatis.Runtime.current.exception( exception )
+                finally:
+                    self._mutex.acquire()
+                # one-shot timers stop holding the runtime only once
+                # what they fired has been scheduled
+                for timer in due:
+                    if not timer._interval:
+                        self._pending -= 1
+                        self._unhold()
+            self._turning = False
+
+class Timer(object):
+    """A pending call from the timer service."""
+
+    def __init__( self, timers, function, interval ):
+        self._timers = timers
+        self._function = function
+        self._interval = interval
+        self._state = "pending"
+
+    def cancel( self ):
+        """Stops the timer from firing (again). Returns False if it
+        had already fired, or been cancelled."""
+        return self._timers._cancel( self )
+
+class Send(object):
+    """Sends a message, released, to an actor name. Scheduled by the
+    timers set up by dramatis.send_after and dramatis.send_interval,
+    so that the message is sent from a worker rather than the timer
+    thread."""
+
+    def __init__( self, name, method, args ):
+        self.actor = super(dramatis.Actor.Name,name).__getattribute__("_actor")
+        self._name = name
+        self._method = method
+        self._args = args
+
+    def __call__( self ):
+        dramatis.runtime.Scheduler.current.schedule( self )
+
+    def deliver( self ):
+        getattr( dramatis.release( self._name ), self._method )( *self._args )
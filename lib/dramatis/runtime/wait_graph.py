@@ -0,0 +1,112 @@
+from __future__ import absolute_import
+from __future__ import with_statement
+
+from logging import warning
+
+from threading import Lock
+
+import dramatis
+
+class WaitGraph(object):
+    """The actors' wait-for graph.
+
+    An actor waiting on an rpc or a future has an edge to the actor
+    that the call went to; the edge goes away as soon as that actor
+    answers. Edges are added one at a time, so a new cycle has to run
+    through the newest edge and only the actors reachable from it are
+    looked at.
+
+    A cycle is a deadlock when none of its actors can run: each is
+    gated on its own wait, so the call it is waiting on, queued at the
+    next actor, cannot be delivered. The scheduler's check for a
+    runtime with nothing left to run still catches deadlocks that
+    aren't cycles, e.g., a call to a gate nobody will open."""
+
+    def __init__( self ):
+        self._mutex = Lock()
+        self._waits = {}
+
+    def wait( self, actor, continuation ):
+        """Records that actor waits for continuation's call. Returns
+        the waits making up a deadlocked cycle through it, or None."""
+        with self._mutex:
+            if continuation._answered or continuation._task is None:
+                return None
+            continuation._waiter = actor
+            self._waits.setdefault( actor, [] ).append( continuation )
+            if _runnable( actor ):
+                return None
+            path = [ continuation ]
+            if self._path( continuation._task.actor, actor, path, set() ):
+                return path
+            return None
+
+    def answer( self, continuation ):
+        """Records that continuation's call has been answered. Returns
+        False if it already had been."""
+        with self._mutex:
+            if continuation._answered:
+                return False
+            continuation._answered = True
+            self._remove( continuation )
+            return True
+
+    def unwait( self, continuation ):
+        """Records that the actor waiting for continuation's call, if
+        any, has stopped waiting without an answer."""
+        with self._mutex:
+            self._remove( continuation )
+
+    def _remove( self, continuation ):
+        actor = continuation._waiter
+        if actor is None:
+            return
+        continuation._waiter = None
+        waits = self._waits[actor]
+        waits.remove( continuation )
+        if not waits:
+            del self._waits[actor]
+
+    def _path( self, node, actor, path, seen ):
+        # depth first search from node back to actor through actors
+        # that can't run
+        if node is actor:
+            return True
+        if node in seen or _runnable( node ):
+            return False
+        seen.add( node )
+        for continuation in self._waits.get( node, () ):
+            path.append( continuation )
+            if self._path( continuation._task.actor, actor, path, seen ):
+                return True
+            path.pop()
+        return False
+
+def _runnable( actor ):
+    # an actor gated on a wait isn't going anywhere even while it is
+    # still running the task that started the wait, as a coroutine is
+    # when it yields a future
+    return actor.runnable and not actor.awaiting
+
+def breakers( cycle, exception ):
+    """Removes the calls in cycle that are still queued and returns
+    tasks for the scheduler that fail them with exception.
+
+    Each call is failed as its own actor, as the scheduler's global
+    deadlock handling does."""
+    result = []
+    for continuation in cycle:
+        task = continuation._task
+        if task.actor.withdraw( task ):
+            result.append( _Breaker( task, exception ) )
+    return result
+
+class _Breaker(object):
+
+    def __init__( self, task, exception ):
+        self.actor = task.actor
+        self._task = task
+        self._exception = exception
+
+    def deliver( self ):
+        self._task.exception( self._exception )
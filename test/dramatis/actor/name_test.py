@@ -4,6 +4,8 @@ import inspect
 import sys
 import os.path
 import threading
+import gc
+import weakref
 
 from logging import warning
 
@@ -20,6 +22,7 @@ from sys import exc_info
 
 import dramatis
 import dramatis.error
+import dramatis.actor.name.dispatch
 from dramatis import interface
 Actor = dramatis.Actor
 
@@ -224,3 +227,66 @@ class Name_Test ( DramatisTestHelper ):
                 return "okay"
         actor = Foo()
         assert actor << "foobar" == "okay"
+
+    def test_dispatch_follows_become(self):
+        "should look attributes up again after become"
+        class B( object ):
+            def x( self ):
+                return "method"
+        class A( dramatis.Actor ):
+            @property
+            def x( self ):
+                return "property"
+            def switch( self ):
+                self.actor.become( B() )
+        actor = A()
+        assert actor.x == "property"
+        assert actor.switch is actor.switch
+        actor.switch()
+        assert actor.x() == "method"
+
+    def test_names_share_options(self):
+        "should share one read only options record among like names"
+        class A( dramatis.Actor ):
+            def x( self ):
+                return "x"
+        a, b = A(), A()
+        options = lambda n: super(dramatis.Actor.Name,n).\
+            __getattribute__("_options")
+        assert options( a ) is options( b )
+        assert options( dramatis.future( a ) ) is \
+            options( dramatis.future( b ) )
+        assert options( dramatis.future( a ) ) is not options( a )
+        try:
+            options( a )["continuation"] = "none"
+            raise Exception( "should have raised" )
+        except TypeError: pass
+        assert interface( dramatis.future( a ).x() ).value == "x"
+        assert a.x() == "x"
+
+    def test_derived_names_cached(self):
+        "should make released and future names once per name"
+        class A( dramatis.Actor ):
+            def x( self ):
+                return "x"
+        a = A()
+        assert dramatis.release( a ) is dramatis.release( a )
+        assert dramatis.future( a ) is dramatis.future( a )
+        assert dramatis.release( a ) is not dramatis.future( a )
+        assert dramatis.release( a ).x() is None
+        assert interface( dramatis.future( a ).x() ).value == "x"
+
+    def test_dispatch_tables_die_with_classes(self):
+        "should not keep behavior classes alive with their dispatch tables"
+        class A( object ):
+            @property
+            def x( self ):
+                return "property"
+        table = dramatis.actor.name.dispatch.table( A )
+        assert table["x"] == "property"
+        table = weakref.ref( table )
+        cls = weakref.ref( A )
+        del A
+        gc.collect()
+        assert cls() is None
+        assert table() is None
@@ -102,3 +102,48 @@ class Task_Test ( DramatisTestHelper ):
       
     def test_call_d_e_on_main(self):
         "should call dramatis_exception on main if that works(?)"
+
+    def test_integer_identities(self):
+        "should number continuations and call threads from one sequence"
+        call_threads = []
+        continuations = []
+        class Recording (dramatis.runtime.policy.FIFO):
+            # sees every task scheduled
+            shared = True
+            def append(self, task):
+                if getattr( task, "dest", None ) == "continuation":
+                    continuations.append( task.method )
+                elif getattr( task, "method", None ) == "back":
+                    call_threads.append( task.call_thread )
+                super(Recording,self).append( task )
+        class A (dramatis.Actor):
+            def __init__(self):
+                self.actor.enable_call_threading()
+            def ask(self, b):
+                return b.back( self )
+            def answer(self):
+                return "answered"
+        class B (dramatis.Actor):
+            def __init__(self):
+                self.actor.enable_call_threading()
+            def back(self, a):
+                return a.answer()
+            def value(self):
+                return "value"
+        dramatis.runtime.Scheduler.policy = Recording
+        try:
+            dramatis.Runtime.reset()
+            a, b = A(), B()
+            # the call back into a only gets in on a's call thread
+            assert a.ask( b ) == "answered"
+            assert a.ask( b ) == "answered"
+            assert [ type(t) for t in call_threads ] == [ int, int ]
+            assert call_threads[1] > call_threads[0]
+            future = dramatis.future( b ).value()
+            dramatis.Runtime.current.quiesce()
+            assert interface( future ).value == "value"
+            assert continuations
+            assert [ type(c) for c in continuations ] == \
+                [ int ] * len(continuations)
+        finally:
+            dramatis.runtime.Scheduler.policy = dramatis.runtime.policy.FIFO
@@ -518,3 +518,382 @@ class Actor_Test ( DramatisTestHelper ):
 
         aC = c()
         assert aC.f() == 2
+
+    def test_rpc_handoff(self):
+        "it should hand rpc results and exceptions directly to a blocked caller"
+
+        handoffs = []
+        handoff = dramatis.runtime.Actor.handoff
+        def counting( self, c, method, value ):
+            result = handoff( self, c, method, value )
+            if result:
+                handoffs.append( method )
+            return result
+        dramatis.runtime.Actor.handoff = counting
+
+        # the callees sleep so that the caller is blocked by the
+        # time they finish
+        class Callee ( dramatis.Actor ):
+            def echo( self, v ):
+                time.sleep( 0.01 )
+                return v
+            def fail( self ):
+                time.sleep( 0.01 )
+                raise Exception( "fail" )
+
+        try:
+            callee = Callee()
+            assert callee.echo( 1 ) == 1
+            okay = False
+            try:
+                callee.fail()
+            except Exception, e:
+                okay = str(e) == "fail"
+            assert okay
+            dramatis.Runtime.current.quiesce()
+        finally:
+            dramatis.runtime.Actor.handoff = handoff
+
+        assert handoffs[-2:] == [ "result", "exception" ]
+
+    def test_caller_runs(self):
+        "it should run calls to idle caller-runs actors on the caller's thread"
+
+        class Callee ( dramatis.Actor ):
+            def __init__( self ):
+                self.actor.enable_caller_runs()
+                self.actor.refuse( "refused" )
+            def thread( self ):
+                return threading.currentThread()
+            def fail( self ):
+                raise Exception( "fail" )
+            def refused( self ):
+                return threading.currentThread()
+            def open( self ):
+                self.actor.default( "refused" )
+
+        class Opener ( dramatis.Actor ):
+            def open( self, callee ):
+                time.sleep( 0.05 )
+                callee.open()
+
+        class Caller ( dramatis.Actor ):
+            def __init__( self, callee ):
+                self._callee = callee
+            def call( self ):
+                return threading.currentThread(), self._callee.thread()
+            def fail( self ):
+                try:
+                    self._callee.fail()
+                except Exception, e:
+                    return str(e)
+            def refused( self, opener ):
+                dramatis.release( opener ).open( self._callee )
+                return threading.currentThread(), self._callee.refused()
+
+        callee = Callee()
+        caller = Caller( callee )
+        mine, theirs = caller.call()
+        assert mine is theirs
+        assert caller.fail() == "fail"
+        mine, theirs = caller.refused( Opener() )
+        assert mine is not theirs
+        assert callee.thread() is not threading.currentThread()
+
+    def test_caller_runs_call_threading(self):
+        "it should take calls back on a call thread from a caller-runs actor"
+
+        class Callee ( dramatis.Actor ):
+            def __init__( self ):
+                self.actor.enable_call_threading()
+                self.actor.enable_caller_runs()
+            def call( self, caller ):
+                return caller.back()
+
+        class Caller ( dramatis.Actor ):
+            def __init__( self, callee ):
+                self.actor.enable_call_threading()
+                self._callee = callee
+            def call( self ):
+                return self._callee.call( self )
+            def back( self ):
+                return "ok"
+
+        assert Caller( Callee() ).call() == "ok"
+
+    def test_cycle_deadlock(self):
+        "should fail a deadlocked cycle while other actors keep running"
+
+        class Pair ( dramatis.Actor ):
+            def __init__( self ):
+                self._other = None
+            def pair( self, other ):
+                self._other = other
+            def ping( self ):
+                try:
+                    time.sleep( 0.02 )
+                    return self._other.pong()
+                except dramatis.Deadlock:
+                    return "deadlock"
+            def pong( self ): pass
+
+        class Ticker ( dramatis.Actor ):
+            def __init__( self ):
+                self._ticks = 0
+            def tick( self, n ):
+                self._ticks += 1
+                if n > 0:
+                    time.sleep( 0.01 )
+                    dramatis.release( self.actor.name ).tick( n - 1 )
+            @property
+            def ticks( self ):
+                return self._ticks
+
+        one = Pair()
+        two = Pair()
+        one.pair( two )
+        two.pair( one )
+        ticker = Ticker()
+        dramatis.release( ticker ).tick( 100 )
+        ping_one = dramatis.future( one ).ping()
+        assert two.ping() == "deadlock"
+        assert dramatis.interface( ping_one ).value == "deadlock"
+        # found without waiting for the runtime to go idle
+        assert ticker.ticks < 100
+        assert len( dramatis.Runtime.current.exceptions() ) == 0
+
+    def test_rpc_timeout(self):
+        "should raise a timeout when an rpc isn't answered in time"
+
+        class Slow ( dramatis.Actor ):
+            def __init__( self ):
+                self._calls = 0
+            def nap( self, t ):
+                self._calls += 1
+                time.sleep( t )
+                return t
+            @property
+            def calls( self ):
+                return self._calls
+
+        slow = Slow()
+        hasty = interface( slow ).continuation( { "timeout": 0.05 } )
+        assert hasty.nap( 0 ) == 0
+        okay = False
+        t = time.time()
+        try:
+            hasty.nap( 0.2 )
+            raise Exception("should not be reached")
+        except dramatis.error.Timeout: okay = True
+        assert okay
+        assert time.time() - t < 0.2
+        # the late answer is dropped and the gate is open again
+        assert slow.nap( 0 ) == 0
+        # a call still queued when its timeout expires is not run
+        dramatis.release( slow ).nap( 0.2 )
+        okay = False
+        try:
+            hasty.nap( 0 )
+        except dramatis.error.Timeout: okay = True
+        assert okay
+        assert slow.calls == 4
+
+    def test_block_timeout(self):
+        "should call the exception function when a block isn't answered in time"
+
+        class Slow ( dramatis.Actor ):
+            def nap( self, t ):
+                time.sleep( t )
+                return t
+
+        class Caller ( dramatis.Actor ):
+            def __init__( self ):
+                self._outcomes = []
+            def call( self, slow, t ):
+                outcomes = self._outcomes
+                interface( slow ).continuation(
+                    { "result": lambda v: outcomes.append( v ),
+                      "exception": lambda e: outcomes.append( type( e ) ),
+                      "timeout": 0.05 } ).nap( t )
+            @property
+            def outcomes( self ):
+                return self._outcomes
+
+        slow = Slow()
+        caller = Caller()
+        caller.call( slow, 0 )
+        caller.call( slow, 0.2 )
+        time.sleep( 0.1 )
+        assert caller.outcomes == [ 0, dramatis.error.Timeout ]
+        # the late answer is dropped
+        time.sleep( 0.2 )
+        assert caller.outcomes == [ 0, dramatis.error.Timeout ]
+
+    def test_future_timeout(self):
+        "should raise a timeout when a future's value doesn't arrive in time"
+
+        class Slow ( dramatis.Actor ):
+            def nap( self, t ):
+                time.sleep( t )
+                return t
+
+        slow = Slow()
+        future = dramatis.future( slow ).nap( 0.2 )
+        okay = False
+        try:
+            interface( future ).get( 0.05 )
+            raise Exception("should not be reached")
+        except dramatis.error.Timeout: okay = True
+        assert okay
+        assert interface( future ).ready
+        future = dramatis.future( slow ).nap( 0 )
+        assert interface( future ).get( 1 ) == 0
+
+    def test_future_cancel(self):
+        "should withdraw or flag calls whose futures are cancelled"
+
+        class Worker ( dramatis.Actor ):
+            def __init__( self ):
+                self._runs = []
+            def spin( self, tag ):
+                self._runs.append( tag )
+                while not self.actor.cancelled:
+                    time.sleep( 0.01 )
+                return tag
+            def quick( self ):
+                return "quick"
+            @property
+            def runs( self ):
+                return self._runs
+
+        worker = Worker()
+        running = dramatis.future( worker ).spin( "running" )
+        queued = dramatis.future( worker ).spin( "queued" )
+        time.sleep( 0.05 )
+        assert interface( queued ).cancel()
+        assert interface( running ).cancel()
+        assert not interface( running ).cancel()
+        for future in ( running, queued ):
+            okay = False
+            try:
+                interface( future ).value
+            except dramatis.error.Cancelled: okay = True
+            assert okay
+        assert worker.quick() == "quick"
+        assert worker.runs == [ "running" ]
+        done = dramatis.future( worker ).quick()
+        assert interface( done ).value == "quick"
+        assert not interface( done ).cancel()
+
+    def test_forward(self):
+        "should let the actor a call is forwarded to answer the caller"
+
+        class Server ( dramatis.Actor ):
+            def login( self, user ):
+                time.sleep( 0.1 )
+                if user == "mallory":
+                    raise Exception( "refused" )
+                return "welcome " + user
+
+        class Connection ( dramatis.Actor ):
+            def __init__( self, server ):
+                self._server = server
+            def login( self, user ):
+                self.actor.forward( self._server ).login( user )
+                return "not this"
+            def ping( self ):
+                return "pong"
+
+        connection = Connection( Server() )
+        assert connection.login( "alice" ) == "welcome alice"
+        future = dramatis.future( connection ).login( "bob" )
+        start = time.time()
+        assert connection.ping() == "pong"
+        assert time.time() - start < 0.05
+        assert interface( future ).value == "welcome bob"
+        okay = False
+        try:
+            connection.login( "mallory" )
+        except Exception, e:
+            okay = str(e) == "refused"
+        assert okay
+
+    def test_forward_raise(self):
+        "should answer a forwarded call once if the method then raises"
+
+        class Server ( dramatis.Actor ):
+            def login( self, user ):
+                return "welcome " + user
+
+        class Connection ( dramatis.Actor ):
+            def __init__( self, server ):
+                self._server = server
+            def login( self, user ):
+                self.actor.forward( self._server ).login( user )
+                raise Exception( "after forwarding" )
+
+        class Client ( dramatis.Actor ):
+            def __init__( self ):
+                self._answers = []
+            def login( self, connection ):
+                interface( connection ).continuation(
+                    { "result": lambda v: self._answers.append( v ),
+                      "exception": lambda e: self._answers.append( e ) }
+                    ).login( "alice" )
+            @property
+            def answers( self ):
+                return self._answers
+
+        client = Client()
+        client.login( Connection( Server() ) )
+        dramatis.Runtime.current.warnings = False
+        okay = False
+        try:
+            dramatis.Runtime.current.quiesce()
+        except dramatis.error.Uncaught: okay = True
+        assert okay
+        dramatis.Runtime.current.warnings = True
+        # the exception goes to the runtime, not the caller
+        assert len( dramatis.Runtime.current.exceptions() ) == 1
+        dramatis.Runtime.current.clear_exceptions()
+        assert client.answers == [ "welcome alice" ]
+
+    def test_stream(self):
+        "should stream the items a method returns, a window ahead"
+
+        class Producer ( dramatis.Actor ):
+            def __init__( self ):
+                self._produced = 0
+            def count( self, n ):
+                for i in xrange( n ):
+                    self._produced += 1
+                    yield i
+            def fail( self ):
+                yield 1
+                raise Exception( "fail" )
+            @property
+            def produced( self ):
+                return self._produced
+
+        producer = Producer()
+        items = dramatis.stream( producer, 4 ).count( 100 )
+        assert items.next() == 0
+        time.sleep( 0.05 )
+        assert producer.produced <= 5
+        assert list( items ) == range( 1, 100 )
+        assert producer.produced == 100
+
+        items = dramatis.stream( producer, 1 ).fail()
+        assert items.next() == 1
+        okay = False
+        try:
+            items.next()
+        except Exception, e:
+            okay = str(e) == "fail"
+        assert okay
+
+        items = dramatis.stream( producer, 2 ).count( 1000 )
+        assert items.next() == 0
+        items.close()
+        dramatis.Runtime.current.quiesce()
+        assert producer.produced < 110
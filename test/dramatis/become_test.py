@@ -119,6 +119,24 @@ class Become_Test ( DramatisTestHelper ):
                 assert isinstance(self,dramatis.Actor.Behavior)
         C().check()
 
+    def test_no_classes_per_instance(self):
+        "it should keep the behavior's class when binding or becoming"
+        class C ( dramatis.Actor ):
+            def kind(self):
+                return type(self)
+            def switch(self, other):
+                self.actor.become( other )
+        class D ( dramatis.Actor.Behavior ):
+            def kind(self):
+                return type(self)
+        assert C().kind() is C
+        d = D()
+        assert type(d) is D
+        c = C()
+        c.switch( d )
+        assert c.kind() is D
+        assert type(d) is D
+
     def test_change_behavior(self):
         "it should change behavior on become"
         self.setup_becoming()
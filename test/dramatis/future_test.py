@@ -0,0 +1,302 @@
+#!/bin/env python
+
+import inspect
+import sys
+import os.path
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..', 'lib' ) ]
+
+from logging import warning
+import time
+
+import dramatis
+import dramatis.runtime
+from dramatis import interface
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..' ) ]
+from test_helper import DramatisTestHelper
+
+class Shard ( dramatis.Actor ):
+    def query( self, t ):
+        time.sleep( t )
+        return t
+    def fail( self ):
+        raise Exception( "fail" )
+
+class Gatherer ( dramatis.Actor ):
+    def __init__( self, shards ):
+        self._shards = shards
+    def all( self, times ):
+        futures = [ dramatis.future( shard ).query( t )
+                    for shard, t in zip( self._shards, times ) ]
+        dramatis.wait_all( futures )
+        return [ interface( future ).value for future in futures ]
+    def any( self, times ):
+        futures = [ dramatis.future( shard ).query( t )
+                    for shard, t in zip( self._shards, times ) ]
+        return interface( dramatis.wait_any( futures ) ).value
+    def completed( self, times ):
+        futures = [ dramatis.future( shard ).query( t )
+                    for shard, t in zip( self._shards, times ) ]
+        return [ interface( future ).value
+                 for future in dramatis.as_completed( futures ) ]
+
+class Maker ( dramatis.Actor ):
+    def make( self, shard, t ):
+        return dramatis.future( shard ).query( t )
+
+class Mixer ( dramatis.Actor ):
+    def __init__( self, shard ):
+        self._shard = shard
+    def any( self, other ):
+        mine = dramatis.future( self._shard ).query( 0 )
+        # in before the wait
+        interface( mine ).value
+        return interface( dramatis.wait_any( [ other, mine ] ) ).value
+
+class Caller ( dramatis.Actor ):
+    def __init__( self, callee ):
+        self._callee = callee
+    def cycle( self ):
+        futures = [ dramatis.future( self._callee ).back( self.actor.name ) ]
+        dramatis.wait_all( futures )
+        return interface( futures[0] ).value
+    def pong( self ):
+        return "pong"
+
+class Callee ( dramatis.Actor ):
+    def back( self, caller ):
+        try:
+            return caller.pong()
+        except dramatis.Deadlock:
+            return "deadlock"
+
+class Future_Test ( DramatisTestHelper ):
+
+    def teardown(self):
+        self.runtime_check()
+
+    def test_wait_all(self):
+        "wait_all should wait for every future"
+        shards = [ Shard() for i in xrange(4) ]
+        gatherer = Gatherer( shards )
+        assert gatherer.all( [ 0.04, 0, 0.02, 0.01 ] ) == [ 0.04, 0, 0.02, 0.01 ]
+
+    def test_wait_any(self):
+        "wait_any should return the first future to get its value"
+        shards = [ Shard() for i in xrange(3) ]
+        gatherer = Gatherer( shards )
+        assert gatherer.any( [ 0.2, 0.01, 0.2 ] ) == 0.01
+
+    def test_wait_any_empty(self):
+        "wait_any should refuse an empty list"
+        okay = False
+        try:
+            dramatis.wait_any( [] )
+        except dramatis.error.Error: okay = True
+        assert okay
+
+    def test_own_first(self):
+        "a group should look at its own futures before blocking on others"
+        other = Maker().make( Shard(), 0.3 )
+        start = time.time()
+        assert Mixer( Shard() ).any( other ) == 0
+        assert time.time() - start < 0.3
+        assert interface( other ).value == 0.3
+
+    def test_as_completed(self):
+        "as_completed should return futures in the order their values arrive"
+        shards = [ Shard() for i in xrange(3) ]
+        gatherer = Gatherer( shards )
+        assert gatherer.completed( [ 0.1, 0, 0.05 ] ) == [ 0, 0.05, 0.1 ]
+
+    def test_main(self):
+        "the combinators should work from main"
+        shards = [ Shard() for i in xrange(3) ]
+        futures = [ dramatis.future( shard ).query( 0.01 * i )
+                    for i, shard in enumerate( shards ) ]
+        first = dramatis.wait_any( futures )
+        dramatis.wait_all( futures )
+        for future in futures:
+            assert interface( future ).ready
+        assert interface( first ).value == 0
+
+    def test_group_deadlock(self):
+        "a group wait should be in the wait-for graph"
+        # a pending timer keeps the runtime from going idle, so only
+        # the wait-for graph can see the cycle
+        timer = dramatis.send_after( 5, Shard(), "query", 0 )
+        try:
+            start = time.time()
+            assert Caller( Callee() ).cycle() == "deadlock"
+            assert time.time() - start < 2
+        finally:
+            timer.cancel()
+
+    def test_exceptions(self):
+        "a future with an exception counts as having its value"
+        shard = Shard()
+        futures = [ dramatis.future( shard ).fail(),
+                    dramatis.future( shard ).query( 0 ) ]
+        dramatis.wait_all( futures )
+        okay = False
+        try:
+            interface( futures[0] ).value
+        except Exception, e:
+            okay = str(e) == "fail"
+        assert okay
+
+    def test_one_suspension(self):
+        "wait_all should suspend the caller once"
+        shards = [ Shard() for i in xrange(20) ]
+        gatherer = Gatherer( shards )
+        scheduler = dramatis.runtime.Scheduler.current
+        suspend = scheduler.suspend_notification
+        count = [ 0 ]
+        def counting( continuation ):
+            count[0] += 1
+            suspend( continuation )
+        scheduler.suspend_notification = counting
+        try:
+            gatherer.all( [ 0.01 ] * 20 )
+        finally:
+            del scheduler.suspend_notification
+        # main's rpc and the gatherer's wait
+        assert count[0] == 2
+
+    def test_done_callback(self):
+        "add_done_callback should call back on the registering actor"
+
+        class Listener ( dramatis.Actor ):
+            def __init__( self, shard ):
+                self._shard = shard
+                self._heard = []
+            def listen( self ):
+                future = dramatis.future( self._shard ).query( 0.01 )
+                interface( future ).add_done_callback(
+                    lambda f: self._heard.append( interface( f ).value ) )
+                failed = dramatis.future( self._shard ).fail()
+                interface( failed ).add_done_callback(
+                    lambda f: self._heard.append( interface( f ).ready ) )
+            @property
+            def heard( self ):
+                return self._heard
+
+        listener = Listener( Shard() )
+        listener.listen()
+        dramatis.Runtime.current.quiesce()
+        assert listener.heard == [ 0.01, True ]
+
+    def test_then(self):
+        "then should chain functions and futures without blocking"
+        one = Shard()
+        two = Shard()
+        future = dramatis.future( one ).query( 0.01 )
+        chained = interface( future ).then( lambda v: v * 2 )
+        chained = interface( chained ).then(
+            lambda v: dramatis.future( two ).query( v ) )
+        assert interface( chained ).value == 0.02
+        failed = interface( dramatis.future( one ).fail() ).then(
+            lambda v: "not reached" )
+        okay = False
+        try:
+            interface( failed ).value
+        except Exception, e:
+            okay = str(e) == "fail"
+        assert okay
+
+    def test_then_siblings(self):
+        "waiting on a then future should not run its siblings' functions"
+
+        class Chainer ( dramatis.Actor ):
+            def __init__( self ):
+                self._log = []
+            def chain( self, shard ):
+                future = interface( dramatis.future( shard ).query( 0.05 ) ).\
+                    then( lambda v: v )
+                first = interface( future ).then(
+                    lambda v: self._log.append( "first" ) )
+                interface( future ).then(
+                    lambda v: self._log.append( "second" ) )
+                interface( first ).value
+                return list( self._log )
+            @property
+            def log( self ):
+                return self._log
+
+        chainer = Chainer()
+        assert chainer.chain( Shard() ) == [ "first" ]
+        dramatis.Runtime.current.quiesce()
+        assert chainer.log == [ "first", "second" ]
+
+    def test_then_timeout(self):
+        "a future made by then should time out"
+        future = dramatis.future( Shard() ).query( 0.2 )
+        chained = interface( future ).then( lambda v: v * 2 )
+        okay = False
+        try:
+            interface( chained ).get( 0.05 )
+        except dramatis.error.Timeout: okay = True
+        assert okay
+        assert interface( future ).value == 0.2
+
+    def test_pipeline(self):
+        "calls pipelined on a future should go to the name it will hold"
+
+        class Session ( dramatis.Actor ):
+            def login( self, user ):
+                return "welcome " + user
+
+        class Server ( dramatis.Actor ):
+            def connect( self, password ):
+                if password != "secret":
+                    raise Exception( "refused" )
+                time.sleep( 0.01 )
+                return Session()
+            def count( self ):
+                return 1
+
+        server = Server()
+        connected = dramatis.future( server ).connect( "secret" )
+        login = dramatis.pipeline( connected ).login( "alice" )
+        assert not interface( connected ).ready
+        assert interface( login ).value == "welcome alice"
+
+        refused = dramatis.future( server ).connect( "guess" )
+        login = dramatis.pipeline( refused ).login( "alice" )
+        okay = False
+        try:
+            interface( login ).value
+        except Exception, e:
+            okay = str(e) == "refused"
+        assert okay
+
+        counted = dramatis.future( server ).count()
+        login = dramatis.pipeline( counted ).login( "alice" )
+        okay = False
+        try:
+            interface( login ).value
+        except dramatis.error.Error:
+            okay = True
+        assert okay
+
+    def test_pipeline_timeout(self):
+        "a pipelined future should time out"
+
+        class Session ( dramatis.Actor ):
+            def login( self, user ):
+                return "welcome " + user
+
+        class Server ( dramatis.Actor ):
+            def connect( self ):
+                time.sleep( 0.2 )
+                return Session()
+
+        connected = dramatis.future( Server() ).connect()
+        login = dramatis.pipeline( connected ).login( "alice" )
+        okay = False
+        try:
+            interface( login ).get( 0.05 )
+        except dramatis.error.Timeout: okay = True
+        assert okay
+        interface( connected ).value
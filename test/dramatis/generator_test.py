@@ -0,0 +1,197 @@
+#!/bin/env python
+
+import inspect
+import sys
+import os.path
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..', 'lib' ) ]
+
+from logging import warning
+import time
+import threading
+
+import dramatis
+import dramatis.runtime
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..' ) ]
+from test_helper import DramatisTestHelper
+
+class Store ( dramatis.Actor ):
+    def __init__( self ):
+        self.actor.refuse( "get" )
+    def open( self ):
+        self.actor.default( "get" )
+    def get( self, v ):
+        return v
+    def fail( self ):
+        raise Exception( "fail" )
+
+class Generator_Test ( DramatisTestHelper ):
+
+    def teardown(self):
+        self.runtime_check()
+
+    def test_yield_future(self):
+        "it should resume a generator method with the value of the future it yields"
+
+        class Client ( dramatis.Actor ):
+            def __init__( self, store ):
+                self._store = store
+            @dramatis.coroutine
+            def sum( self ):
+                a = yield dramatis.future( self._store ).get( 1 )
+                b = yield dramatis.future( self._store ).get( 2 )
+                yield a + b
+
+        store = Store()
+        store.open()
+        assert Client( store ).sum() == 3
+
+    def test_yield_exception(self):
+        "it should raise exceptions in the generator"
+
+        class Client ( dramatis.Actor ):
+            def __init__( self, store ):
+                self._store = store
+            @dramatis.coroutine
+            def caught( self ):
+                try:
+                    yield dramatis.future( self._store ).fail()
+                except Exception, e:
+                    yield str(e)
+            @dramatis.coroutine
+            def uncaught( self ):
+                yield dramatis.future( self._store ).fail()
+
+        store = Store()
+        client = Client( store )
+        assert client.caught() == "fail"
+        okay = False
+        try:
+            client.uncaught()
+        except Exception, e:
+            okay = str(e) == "fail"
+        assert okay
+
+    def test_no_value(self):
+        "it should return None when the generator finishes"
+
+        class Client ( dramatis.Actor ):
+            def __init__( self, store ):
+                self._store = store
+            @dramatis.coroutine
+            def run( self ):
+                yield dramatis.future( self._store ).get( 1 )
+
+        store = Store()
+        store.open()
+        assert Client( store ).run() == None
+
+    def test_gated_while_suspended(self):
+        "it should gate like an rpc while suspended"
+
+        class Client ( dramatis.Actor ):
+            def __init__( self, store ):
+                self._store = store
+                self._log = []
+            @dramatis.coroutine
+            def run( self ):
+                self._log.append( "run" )
+                v = yield dramatis.future( self._store ).get( 1 )
+                self._log.append( v )
+            def poke( self ):
+                self._log.append( "poke" )
+            @property
+            def log( self ):
+                return self._log
+
+        store = Store()
+        client = Client( store )
+        dramatis.release( client ).run()
+        dramatis.release( client ).poke()
+        time.sleep( 0.05 )
+        store.open()
+        dramatis.Runtime.current.quiesce()
+        assert client.log == [ "run", 1, "poke" ]
+
+    def test_no_threads_held(self):
+        "it should not hold a thread while suspended"
+
+        class Client ( dramatis.Actor ):
+            def __init__( self, store, results ):
+                self._store = store
+                self._results = results
+            @dramatis.coroutine
+            def run( self, i ):
+                v = yield dramatis.future( self._store ).get( i )
+                self._results.append( v )
+
+        results = []
+        store = Store()
+        clients = [ Client( store, results ) for i in xrange(50) ]
+        for i in xrange(len(clients)):
+            dramatis.release( clients[i] ).run( i )
+        time.sleep( 0.05 )
+        assert dramatis.runtime.Scheduler.current.thread_count <= \
+            dramatis.runtime.Scheduler.current.concurrency + 1
+        store.open()
+        dramatis.Runtime.current.quiesce()
+        assert sorted( results ) == range( len(clients) )
+
+    def test_unmarked_generator(self):
+        "it should return a generator from a method not marked as a coroutine"
+
+        class Client ( dramatis.Actor ):
+            def __init__( self, store ):
+                self._store = store
+            def futures( self ):
+                return ( dramatis.future( self._store ).get( i )
+                         for i in xrange( 2 ) )
+            def numbers( self ):
+                yield 1
+                yield 2
+
+        store = Store()
+        store.open()
+        client = Client( store )
+        assert list( client.numbers() ) == [ 1, 2 ]
+        futures = list( client.futures() )
+        assert [ dramatis.interface( f ).value for f in futures ] == [ 0, 1 ]
+
+    def test_deadlock(self):
+        "it should find a cycle through a coroutine wait right away"
+
+        class Coroutine ( dramatis.Actor ):
+            def __init__( self, other ):
+                self._other = other
+            @dramatis.coroutine
+            def get( self ):
+                try:
+                    yield dramatis.future( self._other ).value()
+                except dramatis.Deadlock:
+                    yield "deadlock"
+
+        class Caller ( dramatis.Actor ):
+            def call( self, coroutine ):
+                return coroutine.get()
+            def value( self ):
+                return 1
+
+        class Ticker ( dramatis.Actor ):
+            def __init__( self ):
+                self._ticks = 0
+            def tick( self, n ):
+                self._ticks += 1
+                if n > 0:
+                    time.sleep( 0.01 )
+                    dramatis.release( self.actor.name ).tick( n - 1 )
+            @property
+            def ticks( self ):
+                return self._ticks
+
+        ticker = Ticker()
+        dramatis.release( ticker ).tick( 100 )
+        caller = Caller()
+        assert caller.call( Coroutine( caller ) ) == "deadlock"
+        # found without waiting for the runtime to go idle
+        assert ticker.ticks < 100
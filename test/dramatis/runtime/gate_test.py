@@ -68,3 +68,106 @@ class Gate_Test:
                                        [(object,), True, None ] ]
 
 
+    def test_toggle(self):
+        "should track accept/refuse toggling"
+        for i in xrange(3):
+            self._gate.refuse( "object", "ask" )
+            assert not self._gate.accepts( "object", "ask" )
+            assert self._gate.accepts( "object", "whisper" )
+            self._gate.accept( "object", "ask" )
+            assert self._gate.accepts( "object", "ask" )
+        self._gate.refuse( "object" )
+        assert not self._gate.accepts( "object", "ask" )
+        self._gate.accept( "object", "ask" )
+        assert self._gate.accepts( "object", "ask" )
+        assert not self._gate.accepts( "object", "whisper" )
+        self._gate.default( ( "object", "ask" ) )
+        assert not self._gate.accepts( "object", "ask" )
+
+    def test_argument_patterns(self):
+        "should match argument and type patterns"
+        self._gate.refuse( "object" )
+        self._gate.accept( "object", "put", int )
+        self._gate.accept( "object", "put", "key", "value" )
+        assert self._gate.accepts( "object", "put", 1 )
+        assert not self._gate.accepts( "object", "put", "one" )
+        assert self._gate.accepts( "object", "put", "key", "value" )
+        assert not self._gate.accepts( "object", "put", "key" )
+        assert not self._gate.accepts( "object", "put" )
+        self._gate.always( [ "object", "put" ], True )
+        assert self._gate.accepts( "object", "put", "one" )
+
+    def test_tagged_only(self):
+        "should restrict to a tag and restore by tag"
+        self._gate.only( [ "continuation", "c1" ], { "tag": "c1" } )
+        assert not self._gate.accepts( "object", "foo" )
+        assert not self._gate.accepts( "continuation", "c2", "result", 1 )
+        assert self._gate.accepts( "continuation", "c1", "result", 1 )
+        assert self._gate.accepts( "continuation", "c2", "exception", 1 )
+        self._gate.default_by_tag( "c1" )
+        assert self._gate.accepts( "object", "foo" )
+        assert self._gate.accepts( "continuation", "c2", "result", 1 )
+
+    def test_awaiting(self):
+        "should admit only the awaited continuation while awaiting"
+        list = [ entry[:] for entry in self._gate.list() ]
+        self._gate.awaiting( "c1" )
+        assert not self._gate.accepts( "object", "foo" )
+        assert not self._gate.accepts( "continuation", "c2", "result", 1 )
+        assert self._gate.accepts( "continuation", "c1", "result", 1 )
+        assert self._gate.accepts( "continuation", "c2", "exception", 1 )
+        assert self._gate.decision( "object", "foo" ) == False
+        assert self._gate.decision( "continuation", "c1" ) == True
+        assert self._gate.list() == list
+        self._gate.default_by_tag( "c1" )
+        assert self._gate.accepts( "object", "foo" )
+        assert self._gate.accepts( "continuation", "c2", "result", 1 )
+
+    def test_awaiting_nests(self):
+        "should restore the outer awaited continuation"
+        self._gate.awaiting( "c1" )
+        self._gate.awaiting( "c2" )
+        assert not self._gate.accepts( "continuation", "c1", "result", 1 )
+        assert self._gate.accepts( "continuation", "c2", "result", 1 )
+        self._gate.default_by_tag( "c2" )
+        assert self._gate.accepts( "continuation", "c1", "result", 1 )
+        assert not self._gate.accepts( "continuation", "c2", "result", 1 )
+        self._gate.default_by_tag( "c1" )
+        assert self._gate.accepts( "continuation", "c2", "result", 1 )
+
+    def test_awaiting_always(self):
+        "should keep always rules while awaiting"
+        self._gate.always( [ "object", "ping" ], True )
+        self._gate.awaiting( "c1" )
+        assert self._gate.accepts( "object", "ping" )
+        assert not self._gate.accepts( "object", "foo" )
+        assert self._gate.decision( "object", "ping" ) == True
+        self._gate.default_by_tag( "c1" )
+        assert self._gate.accepts( "object", "foo" )
+
+    def test_awaiting_several(self):
+        "should admit any of several awaited continuations"
+        self._gate.awaiting( "c1" )
+        self._gate.awaiting( "c2", "c3" )
+        assert self._gate.accepts( "continuation", "c2", "result", 1 )
+        assert self._gate.accepts( "continuation", "c3", "result", 1 )
+        assert not self._gate.accepts( "continuation", "c1", "result", 1 )
+        assert self._gate.decision( "continuation", "c3" ) == True
+        self._gate.default_by_tag( "c2" )
+        assert self._gate.accepts( "continuation", "c1", "result", 1 )
+        assert not self._gate.accepts( "continuation", "c3", "result", 1 )
+
+    def test_continuations_not_indexed(self):
+        "should not index a decision per continuation"
+        for i in xrange(100):
+            self._gate.awaiting( i )
+            assert self._gate.decision( "continuation", i ) == True
+            assert self._gate.accepts( "continuation", i, "result", 1 )
+            self._gate.default_by_tag( i )
+            assert self._gate.accepts( "continuation", i, "result", 1 )
+        self._gate.only( [ "continuation", 7 ], { "tag": 7 } )
+        assert self._gate.accepts( "continuation", 7, "result", 1 )
+        assert not self._gate.accepts( "continuation", 8, "result", 1 )
+        assert not [ key for key in self._gate._index.keys() +
+                     self._gate._always_index.keys()
+                     if key[0] == "continuation" ]
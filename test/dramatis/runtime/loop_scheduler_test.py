@@ -0,0 +1,155 @@
+#!/bin/env python
+
+import inspect
+import sys
+import os.path
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..', '..', 'lib' ) ]
+
+from logging import warning
+import time
+import threading
+
+import dramatis
+import dramatis.runtime
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..' ) ]
+from test_helper import DramatisTestHelper
+
+class Link ( dramatis.Actor ):
+    def __init__(self, next):
+        self._next = next
+    def depth(self):
+        if self._next:
+            return self._next.depth() + 1
+        return 1
+    def thread(self):
+        if self._next:
+            return self._next.thread()
+        return threading.currentThread()
+
+class LoopScheduler_Test ( DramatisTestHelper ):
+
+    def setup(self):
+        dramatis.Runtime.reset()
+        dramatis.runtime.Scheduler.engine = dramatis.runtime.LoopScheduler
+
+    def teardown(self):
+        try:
+            self.runtime_check()
+        finally:
+            dramatis.runtime.Scheduler.engine = dramatis.runtime.Scheduler
+
+    def test_selected(self):
+        "it should be used when selected"
+        assert isinstance( dramatis.runtime.Scheduler.current,
+                           dramatis.runtime.LoopScheduler )
+
+    def test_nested_calls(self):
+        "it should run a chain of rpcs"
+        link = None
+        for i in xrange(20):
+            link = Link( link )
+        assert link.depth() == 20
+
+    def test_one_at_a_time(self):
+        "it should run one task at a time"
+
+        class Recorder ( dramatis.Actor ):
+            def __init__(self, running):
+                self._running = running
+            def record(self):
+                self._running.append( 1 )
+                time.sleep( 0.01 )
+                overlap = len( self._running ) > 1
+                self._running.pop()
+                return overlap
+
+        running = []
+        recorders = [ Recorder( running ) for i in xrange(10) ]
+        futures = [ dramatis.future( recorder ).record()
+                    for recorder in recorders ]
+        for future in futures:
+            assert not dramatis.interface( future ).value
+
+    def test_call_back(self):
+        "it should let a call back into an actor that is waiting"
+
+        class B ( dramatis.Actor ):
+            def __init__(self):
+                self.actor.refuse( "slow" )
+            def open(self):
+                self.actor.default( "slow" )
+            def slow(self):
+                return "b"
+
+        class A ( dramatis.Actor ):
+            def __init__(self, b):
+                self._b = b
+            def run(self):
+                # lets x's call queue up before a starts waiting
+                time.sleep( 0.05 )
+                return self._b.slow()
+            def ping(self):
+                return "a"
+
+        class X ( dramatis.Actor ):
+            def call(self, a):
+                return a.ping()
+
+        class Opener ( dramatis.Actor ):
+            def open(self, b):
+                b.open()
+
+        b = B()
+        a = A( b )
+        x = X()
+        opener = Opener()
+        waiting = dramatis.future( a ).run()
+        # x's call back into a has to wait for a's call to return,
+        # which it can only do once b opens
+        calling = dramatis.future( x ).call( a )
+        dramatis.release( opener ).open( b )
+        assert dramatis.interface( waiting ).value == "b"
+        assert dramatis.interface( calling ).value == "a"
+
+    def test_parks_when_dry(self):
+        "it should hand the loop to another thread when a call cannot complete on it"
+
+        class Gated ( dramatis.Actor ):
+            def __init__(self):
+                self.actor.refuse( "get" )
+            def open(self):
+                self.actor.default( "get" )
+            def get(self):
+                return 1
+
+        class Caller ( dramatis.Actor ):
+            def call(self, gated):
+                return gated.get()
+
+        gated = Gated()
+        future = dramatis.future( Caller() ).call( gated )
+        time.sleep( 0.05 )
+        gated.open()
+        assert dramatis.interface( future ).value == 1
+
+    def test_deadlock(self):
+        "it should still detect deadlocks"
+
+        class Gated ( dramatis.Actor ):
+            def __init__(self):
+                self.actor.refuse( "get" )
+            def get(self):
+                return 1
+
+        class Caller ( dramatis.Actor ):
+            def call(self, gated):
+                return gated.get()
+
+        okay = False
+        try:
+            Caller().call( Gated() )
+        except dramatis.Deadlock:
+            okay = True
+        assert okay
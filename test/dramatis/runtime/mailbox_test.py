@@ -0,0 +1,132 @@
+#!/bin/env python
+
+import inspect
+import sys
+import os.path
+
+from logging import warning
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..', 'lib' ) ]
+
+import dramatis.runtime
+from dramatis.runtime.policy import Priority
+from dramatis.runtime.policy import FairShare
+
+class _Task(object):
+    def __init__(self, method, *arguments):
+        self.dest = "object"
+        self.method = method
+        self.arguments = arguments
+        self.call_thread = None
+        self.priority = 0
+        self.sender = None
+
+class Mailbox_Test:
+
+    def setup(self):
+        self._gate = dramatis.runtime.Gate()
+        self._mailbox = dramatis.runtime.Mailbox()
+
+    def test_fifo(self):
+        "should hand out accepted tasks in arrival order"
+        tasks = [ _Task( "a" ), _Task( "b" ), _Task( "a" ) ]
+        for task in tasks:
+            self._mailbox.append( task )
+        assert len( self._mailbox ) == 3
+        for task in tasks:
+            assert self._mailbox.take( self._gate ) is task
+        assert self._mailbox.take( self._gate ) is None
+        assert len( self._mailbox ) == 0
+
+    def test_skip_refused(self):
+        "should skip refused partitions"
+        whispers = [ _Task( "whisper" ) for i in xrange(100) ]
+        ask = _Task( "ask" )
+        self._mailbox.append( ask )
+        for task in whispers:
+            self._mailbox.append( task )
+        self._gate.refuse( "object", "ask" )
+        for task in whispers:
+            assert self._mailbox.take( self._gate ) is task
+        assert self._mailbox.take( self._gate ) is None
+        self._gate.accept( "object", "ask" )
+        assert self._mailbox.take( self._gate ) is ask
+
+    def test_argument_gating(self):
+        "should respect gates that look at arguments"
+        one = _Task( "put", 1 )
+        two = _Task( "put", "two" )
+        self._mailbox.append( two )
+        self._mailbox.append( one )
+        self._gate.refuse( "object", "put" )
+        self._gate.accept( "object", "put", int )
+        assert self._mailbox.take( self._gate ) is one
+        assert self._mailbox.take( self._gate ) is None
+
+    def test_call_thread(self):
+        "should admit refused tasks on the current call thread"
+        task = _Task( "a" )
+        task.call_thread = "thread"
+        self._mailbox.append( task )
+        self._gate.refuse( "object" )
+        assert self._mailbox.take( self._gate ) is None
+        assert self._mailbox.take( self._gate, "thread" ) is task
+
+    def test_drain(self):
+        "should drain in arrival order"
+        tasks = [ _Task( "a" ), _Task( "b" ), _Task( "a" ), _Task( "c" ) ]
+        for task in tasks:
+            self._mailbox.append( task )
+        assert self._mailbox.drain() == tasks
+        assert len( self._mailbox ) == 0
+
+    def test_remove(self):
+        "should remove a queued task"
+        tasks = [ _Task( "a" ), _Task( "b" ), _Task( "a" ) ]
+        for task in tasks:
+            self._mailbox.append( task )
+        assert self._mailbox.remove( tasks[2] )
+        assert not self._mailbox.remove( tasks[2] )
+        assert self._mailbox.remove( tasks[1] )
+        assert len( self._mailbox ) == 1
+        assert self._mailbox.drain() == tasks[0:1]
+
+    def test_rank(self):
+        "should hand out accepted tasks by the policy's rank"
+        self._mailbox = dramatis.runtime.Mailbox( Priority )
+        tasks = [ _Task( "a" ), _Task( "b" ), _Task( "a" ), _Task( "a" ) ]
+        for i, task in enumerate( tasks ):
+            task.priority = i
+            self._mailbox.append( task )
+        self._gate.refuse( "object", "b" )
+        assert self._mailbox.take( self._gate ) is tasks[3]
+        assert self._mailbox.take( self._gate ) is tasks[2]
+        assert self._mailbox.take( self._gate ) is tasks[0]
+        assert self._mailbox.take( self._gate ) is None
+        self._gate.accept( "object", "b" )
+        assert self._mailbox.take( self._gate ) is tasks[1]
+
+    def test_by_sender(self):
+        "should take turns between senders for by_sender policies"
+        self._mailbox = dramatis.runtime.Mailbox( FairShare )
+        chatty = [ _Task( "a" ) for i in xrange(3) ]
+        quiet = [ _Task( "b" ), _Task( "a" ) ]
+        for task in chatty:
+            task.sender = "chatty"
+            self._mailbox.append( task )
+        for task in quiet:
+            task.sender = "quiet"
+            self._mailbox.append( task )
+        order = []
+        while len( self._mailbox ):
+            order.append( self._mailbox.take( self._gate ) )
+        assert order == [ chatty[0], quiet[0], chatty[1], quiet[1], chatty[2] ]
+        # a sender that shows up later doesn't wait for old turns
+        late = _Task( "a" )
+        late.sender = "late"
+        again = _Task( "a" )
+        again.sender = "chatty"
+        self._mailbox.append( again )
+        self._mailbox.append( late )
+        assert self._mailbox.take( self._gate ) is again
+        assert self._mailbox.take( self._gate ) is late
@@ -0,0 +1,189 @@
+#!/bin/env python
+
+import inspect
+import sys
+import os.path
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..', '..', 'lib' ) ]
+
+from logging import warning
+import time
+
+import dramatis
+import dramatis.runtime
+from dramatis.runtime.policy import FIFO
+from dramatis.runtime.policy import Priority
+from dramatis.runtime.policy import FairShare
+from dramatis.runtime.policy import EarliestDeadline
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..' ) ]
+from test_helper import DramatisTestHelper
+
+class _Task(object):
+    def __init__(self, actor, priority = 0, deadline = None,
+                 dest = "object"):
+        self.actor = actor
+        self.priority = priority
+        self.deadline = deadline
+        self.dest = dest
+
+def _drain( queue ):
+    tasks = []
+    while queue:
+        tasks.append( queue.popleft() )
+    return tasks
+
+class Policy_Test:
+
+    def test_fifo(self):
+        "FIFO should keep scheduling order"
+        queue = FIFO()
+        tasks = [ _Task( "a" ), _Task( "b" ), _Task( "a" ) ]
+        for task in tasks:
+            queue.append( task )
+        assert _drain( queue ) == tasks
+
+    def test_priority(self):
+        "Priority should run higher priorities, then continuations, first"
+        queue = Priority()
+        low = _Task( "a", -1 )
+        plain = _Task( "b" )
+        reply = _Task( "c", dest = "continuation" )
+        high = _Task( "d", 5 )
+        for task in ( low, plain, reply, high ):
+            queue.append( task )
+        assert len( queue ) == 4
+        assert _drain( queue ) == [ high, reply, plain, low ]
+        try:
+            queue.popleft()
+            raise Exception("should not be reached")
+        except IndexError: pass
+
+    def test_earliest_deadline(self):
+        "EarliestDeadline should run the earliest deadline first"
+        queue = EarliestDeadline()
+        none = _Task( "a" )
+        late = _Task( "b", deadline = 20 )
+        early = _Task( "c", deadline = 10 )
+        for task in ( none, late, early ):
+            queue.append( task )
+        assert _drain( queue ) == [ early, late, none ]
+
+    def test_fair_share(self):
+        "FairShare should take turns between actors"
+        queue = FairShare()
+        chatty = [ _Task( "a" ) for i in xrange(3) ]
+        quiet = _Task( "b" )
+        for task in chatty:
+            queue.append( task )
+        queue.append( quiet )
+        assert len( queue ) == 4
+        assert _drain( queue ) == [ chatty[0], quiet, chatty[1], chatty[2] ]
+
+class Scheduler_Policy_Test ( DramatisTestHelper ):
+
+    def setup(self):
+        dramatis.Runtime.reset()
+
+    def teardown(self):
+        try:
+            self.runtime_check()
+        finally:
+            dramatis.runtime.Scheduler.policy = FIFO
+
+    def _run( self, send, priorities = {} ):
+        dramatis.runtime.Scheduler.current.concurrency = 1
+        order = []
+
+        class Sleeper ( dramatis.Actor ):
+            def nap( self ):
+                time.sleep( 0.05 )
+
+        class Recorder ( dramatis.Actor ):
+            def __init__( self, tag ):
+                self._tag = tag
+                if tag in priorities:
+                    self.actor.set_priority( priorities[tag] )
+            def record( self ):
+                order.append( self._tag )
+
+        recorders = [ Recorder( i ) for i in xrange(4) ]
+        dramatis.release( Sleeper() ).nap()
+        for i, recorder in enumerate( recorders ):
+            send( i, recorder )
+        dramatis.Runtime.current.quiesce()
+        return order
+
+    def _run_one( self, send ):
+        # sends calls to one actor while it refuses them, so they all
+        # wait in its mailbox rather than in the scheduler's queue
+        order = []
+
+        class Recorder ( dramatis.Actor ):
+            def __init__( self ):
+                self.actor.refuse( "record" )
+            def open( self ):
+                self.actor.accept( "record" )
+            def record( self, tag ):
+                order.append( tag )
+
+        recorder = Recorder()
+        send( recorder )
+        dramatis.release( recorder ).open()
+        dramatis.Runtime.current.quiesce()
+        return order
+
+    def test_priority_names(self):
+        "it should run calls sent through names with higher priorities first"
+        dramatis.runtime.Scheduler.policy = Priority
+        def send( i, recorder ):
+            dramatis.release( dramatis.priority( recorder, i ) ).record()
+        assert self._run( send ) == [ 3, 2, 1, 0 ]
+
+    def test_priority_actors(self):
+        "it should run calls to actors with higher priorities first"
+        dramatis.runtime.Scheduler.policy = Priority
+        def send( i, recorder ):
+            dramatis.release( recorder ).record()
+        assert self._run( send, { 2: 1 } ) == [ 2, 0, 1, 3 ]
+
+    def test_deadline_names(self):
+        "it should run calls with earlier deadlines first"
+        dramatis.runtime.Scheduler.policy = EarliestDeadline
+        def send( i, recorder ):
+            dramatis.release( dramatis.deadline( recorder, 10 - i ) ).record()
+        assert self._run( send ) == [ 3, 2, 1, 0 ]
+
+    def test_priority_mailbox(self):
+        "it should run calls queued at one actor by priority"
+        dramatis.runtime.Scheduler.policy = Priority
+        def send( recorder ):
+            for i in xrange(4):
+                dramatis.release( dramatis.priority( recorder, i ) ).record( i )
+        assert self._run_one( send ) == [ 3, 2, 1, 0 ]
+
+    def test_deadline_mailbox(self):
+        "it should run calls queued at one actor by deadline"
+        dramatis.runtime.Scheduler.policy = EarliestDeadline
+        def send( recorder ):
+            for i in xrange(4):
+                dramatis.release(
+                    dramatis.deadline( recorder, 10 - i ) ).record( i )
+        assert self._run_one( send ) == [ 3, 2, 1, 0 ]
+
+    def test_fair_share_mailbox(self):
+        "it should take turns between actors sending to one actor"
+        dramatis.runtime.Scheduler.policy = FairShare
+
+        class Sender ( dramatis.Actor ):
+            def __init__( self, tag ):
+                self._tag = tag
+            def send( self, recorder, n ):
+                for i in xrange(n):
+                    dramatis.release( recorder ).record( self._tag )
+
+        def send( recorder ):
+            Sender( "chatty" ).send( recorder, 3 )
+            Sender( "quiet" ).send( recorder, 1 )
+        assert self._run_one( send ) == \
+            [ "chatty", "quiet", "chatty", "chatty" ]
@@ -0,0 +1,114 @@
+#!/bin/env python
+
+import inspect
+import sys
+import os.path
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..', '..', 'lib' ) ]
+
+from logging import warning
+import time
+import threading
+
+import dramatis
+import dramatis.runtime
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..' ) ]
+from test_helper import DramatisTestHelper
+
+class Scheduler_Test ( DramatisTestHelper ):
+
+    def teardown(self):
+        self.runtime_check()
+
+    def test_drains_fan_out(self):
+        "it should run every task scheduled from workers and main"
+
+        class Counter ( dramatis.Actor ):
+            def __init__(self):
+                self._count = 0
+            def hit(self, others, depth):
+                self._count += 1
+                if depth > 0:
+                    for other in others:
+                        dramatis.release( other ).hit( others, depth - 1 )
+            @property
+            def count(self):
+                return self._count
+
+        counters = [ Counter() for i in xrange(4) ]
+        for counter in counters:
+            dramatis.release( counter ).hit( counters, 3 )
+        dramatis.Runtime.current.quiesce()
+        total = 0
+        for counter in counters:
+            total += counter.count
+        assert total == 4 * ( 1 + 4 + 16 + 64 )
+
+    def test_bounded_workers(self):
+        "it should not grow past its concurrency for non-blocking work"
+
+        dramatis.runtime.Scheduler.current.concurrency = 2
+
+        class Sleeper ( dramatis.Actor ):
+            def nap(self):
+                time.sleep( 0.05 )
+
+        sleepers = [ Sleeper() for i in xrange(6) ]
+        for sleeper in sleepers:
+            dramatis.release( sleeper ).nap()
+        time.sleep( 0.02 )
+        assert dramatis.runtime.Scheduler.current.thread_count <= 2
+        dramatis.Runtime.current.quiesce()
+
+    def test_suspended_workers_replaced(self):
+        "it should keep running tasks while workers are suspended"
+
+        dramatis.runtime.Scheduler.current.concurrency = 1
+
+        class Link ( dramatis.Actor ):
+            def __init__(self, next):
+                self._next = next
+            def depth(self):
+                if self._next:
+                    return self._next.depth() + 1
+                return 1
+
+        link = None
+        for i in xrange(10):
+            link = Link( link )
+        assert link.depth() == 10
+
+    def test_run_to_drain(self):
+        "it should run up to the throughput quantum on one worker"
+
+        class Recorder ( dramatis.Actor ):
+            def __init__(self):
+                self._threads = []
+                self.actor.refuse( "record" )
+                self.actor.set_throughput( 5 )
+            def open(self):
+                self.actor.default( "record" )
+            def record(self):
+                self._threads.append( threading.currentThread() )
+            @property
+            def threads(self):
+                return self._threads
+
+        # open and four records make up one quantum
+        recorder = Recorder()
+        for i in xrange(4):
+            dramatis.release( recorder ).record()
+        recorder.open()
+        dramatis.Runtime.current.quiesce()
+        threads = recorder.threads
+        assert len( threads ) == 4
+        for thread in threads:
+            assert thread is threads[0]
+
+    def test_runtime_throughput(self):
+        "it should use the runtime quantum when the actor has none"
+
+        dramatis.Runtime.current.throughput = 3
+        actor = dramatis.Actor( object() )
+        assert super(dramatis.Actor.Name,actor).__getattribute__("_actor").throughput == 3
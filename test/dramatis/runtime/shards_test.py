@@ -0,0 +1,137 @@
+#!/bin/env python
+
+import inspect
+import sys
+import os
+import os.path
+import time
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..', '..', 'lib' ) ]
+
+from logging import warning
+
+import dramatis
+import dramatis.runtime
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..' ) ]
+from test_helper import DramatisTestHelper
+
+# shard classes have to be picklable, i.e., defined at module level
+
+class Counter ( dramatis.Actor ):
+    def __init__( self, start ):
+        self._count = start
+        self.actor.refuse( "count" )
+    def increment( self ):
+        self._count += 1
+        self.actor.accept( "count" )
+    @property
+    def count( self ):
+        return self._count
+    def pid( self ):
+        return os.getpid()
+    def fail( self ):
+        raise KeyError( "fail" )
+
+class Plain ( object ):
+    def pid( self ):
+        return os.getpid()
+
+class Sleepy ( object ):
+    def __init__( self, t ):
+        time.sleep( t )
+
+class Spawner ( dramatis.Actor ):
+    def spawn( self, shards ):
+        shards.spawn( Sleepy, 0.1, shard = 0 )
+        return "spawned"
+
+class Releaser ( dramatis.Actor ):
+    def release( self, counter ):
+        dramatis.release( counter ).increment()
+        return "released"
+
+class Shards_Test ( DramatisTestHelper ):
+
+    def setup( self ):
+        self._shards = dramatis.runtime.Shards( 2 )
+
+    def teardown( self ):
+        try:
+            self._shards.stop()
+        finally:
+            self.runtime_check()
+
+    def test_remote_actor( self ):
+        "it should run actors in other processes"
+        counter = self._shards.spawn( Counter, 1 )
+        assert counter.pid() != os.getpid()
+        counter.increment()
+        assert counter.count == 2
+
+    def test_gating( self ):
+        "it should apply the remote actor's gate"
+        counter = self._shards.spawn( Counter, 1 )
+        future = dramatis.future( counter ).count
+        assert not dramatis.interface( future ).ready
+        dramatis.release( counter ).increment()
+        assert dramatis.interface( future ).value == 2
+
+    def test_outstanding( self ):
+        "it should not hold workers for outstanding calls"
+        counter = self._shards.spawn( Counter, 1 )
+        concurrency = dramatis.runtime.Scheduler.current.concurrency
+        futures = [ dramatis.future( counter ).count
+                    for i in xrange( concurrency + 2 ) ]
+        # the local actor needs a worker while the calls are pending
+        assert Releaser().release( counter ) == "released"
+        for future in futures:
+            assert dramatis.interface( future ).value == 2
+
+    def test_spawning( self ):
+        "it should not hold workers for actors being spawned"
+        counter = self._shards.spawn( Counter, 1 )
+        concurrency = dramatis.runtime.Scheduler.current.concurrency
+        futures = [ dramatis.future( Spawner() ).spawn( self._shards )
+                    for i in xrange( concurrency + 2 ) ]
+        t = time.time()
+        assert Releaser().release( counter ) == "released"
+        assert time.time() - t < 0.1
+        for future in futures:
+            assert dramatis.interface( future ).value == "spawned"
+
+    def test_plain( self ):
+        "it should run plain objects as naked actors"
+        plain = self._shards.spawn( Plain )
+        assert plain.pid() != os.getpid()
+
+    def test_exception( self ):
+        "it should raise remote exceptions"
+        counter = self._shards.spawn( Counter, 1 )
+        okay = False
+        try:
+            counter.fail()
+        except KeyError:
+            okay = True
+        assert okay
+
+    def test_round_robin( self ):
+        "it should place actors round-robin"
+        pids = [ self._shards.spawn( Plain ).pid() for i in xrange(4) ]
+        assert pids[0] == pids[2]
+        assert pids[1] == pids[3]
+        assert pids[0] != pids[1]
+
+    def test_hint( self ):
+        "it should honor shard hints"
+        pids = [ self._shards.spawn( Plain, shard = 1 ).pid()
+                 for i in xrange(3) ]
+        assert pids[0] == pids[1] == pids[2]
+        assert self._shards.spawn( Plain, shard = 0 ).pid() != pids[0]
+
+    def test_least_loaded( self ):
+        "it should place actors on the least loaded shard"
+        self._shards.stop()
+        self._shards = dramatis.runtime.Shards( 2, "least-loaded" )
+        first = self._shards.spawn( Plain, shard = 0 ).pid()
+        assert self._shards.spawn( Plain ).pid() != first
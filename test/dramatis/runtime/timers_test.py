@@ -0,0 +1,87 @@
+#!/bin/env python
+
+import inspect
+import sys
+import os.path
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..', '..', 'lib' ) ]
+
+from logging import warning
+import time
+import threading
+
+import dramatis
+import dramatis.runtime
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..' ) ]
+from test_helper import DramatisTestHelper
+
+class Recorder ( dramatis.Actor ):
+    def __init__(self):
+        self._times = []
+    def record(self, t):
+        self._times.append( time.time() - t )
+    @property
+    def times(self):
+        return self._times
+
+class Timers_Test ( DramatisTestHelper ):
+
+    def teardown(self):
+        self.runtime_check()
+
+    def test_send_after(self):
+        "it should send a message after the delay"
+        recorder = Recorder()
+        dramatis.send_after( 0.1, recorder, "record", time.time() )
+        # quiesce waits for pending timers
+        dramatis.Runtime.current.quiesce()
+        times = recorder.times
+        assert len( times ) == 1
+        assert times[0] >= 0.1
+        assert times[0] < 0.3
+
+    def test_send_interval(self):
+        "it should send a message periodically until cancelled"
+        recorder = Recorder()
+        timer = dramatis.send_interval( 0.05, recorder, "record", time.time() )
+        time.sleep( 0.28 )
+        assert timer.cancel()
+        assert not timer.cancel()
+        dramatis.Runtime.current.quiesce()
+        times = recorder.times
+        assert 3 <= len( times ) <= 6
+        for i in xrange( len( times ) ):
+            assert times[i] >= 0.05 * ( i + 1 )
+
+    def test_cancel(self):
+        "it should not send a cancelled message"
+        recorder = Recorder()
+        timer = dramatis.send_after( 0.05, recorder, "record", time.time() )
+        assert timer.cancel()
+        time.sleep( 0.1 )
+        dramatis.Runtime.current.quiesce()
+        assert recorder.times == []
+
+    def test_many(self):
+        "it should keep many timers without threads of their own"
+        recorder = Recorder()
+        before = threading.activeCount()
+        timers = [ dramatis.send_after( 1 + i / 1000.0, recorder, "record", 0 )
+                   for i in xrange(10000) ]
+        assert threading.activeCount() <= before + 1
+        for timer in timers:
+            assert timer.cancel()
+        dramatis.Runtime.current.quiesce()
+        assert recorder.times == []
+
+    def test_wheel_wraps(self):
+        "it should fire timers due more than a turn of the wheel away"
+        timers = dramatis.runtime.Scheduler.current.timers
+        fired = []
+        timers.after( timers.tick * ( timers.slots + 3 ),
+                      lambda: fired.append( True ) )
+        time.sleep( timers.tick * timers.slots / 2 )
+        assert fired == []
+        dramatis.Runtime.current.quiesce()
+        assert fired == [ True ]
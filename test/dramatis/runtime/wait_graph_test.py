@@ -0,0 +1,87 @@
+#!/bin/env python
+
+import inspect
+import sys
+import os.path
+
+from logging import warning
+
+sys.path[0:0] = [ os.path.join( os.path.dirname( inspect.getabsfile( inspect.currentframe() ) ), '..', '..', 'lib' ) ]
+
+import dramatis.runtime
+
+class _Actor(object):
+    def __init__(self):
+        self.runnable = False
+        self.awaiting = False
+
+class _Task(object):
+    def __init__(self, actor):
+        self.actor = actor
+
+class _Continuation(object):
+    def __init__(self, actor):
+        self._task = _Task( actor )
+        self._waiter = None
+        self._answered = False
+
+class WaitGraph_Test:
+
+    def setup(self):
+        self._graph = dramatis.runtime.WaitGraph()
+
+    def test_cycle(self):
+        "should find the cycle closed by a wait"
+        a, b, c = _Actor(), _Actor(), _Actor()
+        ab, bc, ca = _Continuation( b ), _Continuation( c ), _Continuation( a )
+        assert self._graph.wait( a, ab ) is None
+        assert self._graph.wait( b, bc ) is None
+        assert self._graph.wait( c, ca ) == [ ca, ab, bc ]
+
+    def test_self(self):
+        "should find an actor waiting on itself"
+        a = _Actor()
+        aa = _Continuation( a )
+        assert self._graph.wait( a, aa ) == [ aa ]
+
+    def test_answered(self):
+        "should drop answered waits"
+        a, b = _Actor(), _Actor()
+        ab, ba = _Continuation( b ), _Continuation( a )
+        self._graph.wait( a, ab )
+        self._graph.answer( ab )
+        assert self._graph.wait( b, ba ) is None
+
+    def test_unwait(self):
+        "should drop waits given up without an answer"
+        a, b = _Actor(), _Actor()
+        ab, ba = _Continuation( b ), _Continuation( a )
+        self._graph.wait( a, ab )
+        self._graph.unwait( ab )
+        assert not ab._answered
+        assert self._graph.wait( b, ba ) is None
+
+    def test_awaiting(self):
+        "should count actors gated on a wait as not runnable"
+        a, b = _Actor(), _Actor()
+        ab, ba = _Continuation( b ), _Continuation( a )
+        self._graph.wait( b, ba )
+        a.runnable = True
+        a.awaiting = True
+        assert self._graph.wait( a, ab ) == [ ab, ba ]
+
+    def test_answered_first(self):
+        "should ignore waits on calls that have already been answered"
+        a, b = _Actor(), _Actor()
+        ab, ba = _Continuation( b ), _Continuation( a )
+        self._graph.answer( ab )
+        self._graph.wait( a, ab )
+        assert self._graph.wait( b, ba ) is None
+
+    def test_runnable(self):
+        "should not count actors that can still run"
+        a, b = _Actor(), _Actor()
+        ab, ba = _Continuation( b ), _Continuation( a )
+        self._graph.wait( a, ab )
+        b.runnable = True
+        assert self._graph.wait( b, ba ) is None